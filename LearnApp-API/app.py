@@ -1,11 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from routes.ollama_course import router
 from routes.mock_course import router as mock_router
 from routes.genai_course import router as genai_router
 from routes.mock_genai_course import router as mock_genai_router
 from routes.studio_router import router as studio_router
-app = FastAPI()
+from routes.metrics_router import router as metrics_router
+from routes.admin_router import router as admin_router
+from services.course_writer import course_writer
+from services.course_watcher import course_watcher
+from services.pdf_export import pdf_exporter
+from utils.artifact_writer import artifact_writer
+from utils.prompt_cache import prompt_caches
+from utils.serializer import orjson
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Imports responses/ in the background, then keeps the store in step with new files
+    course_watcher.start()
+    # Opens the PDF export cache, which scans its directory
+    pdf_exporter.start()
+    # Shared context caches of the static Gemini stage prompts
+    prompt_caches.start()
+    yield
+    await prompt_caches.stop()
+    await course_watcher.stop()
+    pdf_exporter.shutdown()
+    course_writer.shutdown()
+    artifact_writer.shutdown()
+
+app = FastAPI(
+    lifespan=lifespan,
+    # Compact orjson encoding for API payloads when orjson is installed
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
+)
 
 origins = [
     "*",
@@ -17,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Course-Count"],
 )
 
 app.include_router(router)
@@ -24,5 +56,7 @@ app.include_router(mock_router)
 app.include_router(genai_router)
 app.include_router(mock_genai_router)
 app.include_router(studio_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 
 
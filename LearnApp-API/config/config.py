@@ -3,4 +3,87 @@ API_KEYS = []
 
 GEMMA_MODEL="gemma3n:e4b"
 
-OLLAMA_ENDPOINT='http://127.0.0.1:11434'
\ No newline at end of file
+OLLAMA_ENDPOINT='http://127.0.0.1:11434'
+
+RESPONSES_DIR = 'responses'
+
+COURSE_DB_PATH = 'responses/courses.db'
+
+PROGRESS_LOG_PATH = 'responses/progress.log'
+
+COURSE_MAP_PATH = 'responses/1coursemaps.json'
+
+COURSE_CACHE_SIZE = 128
+
+# None writes compact JSON artifacts; set to 2 for human-readable files
+ARTIFACT_INDENT = None
+
+ARCHIVE_DIR = 'responses/archive'
+
+# Courses without writes or tutor chat for this many days move to the cold tier
+COLD_AFTER_DAYS = 30
+
+# Seconds between scans of responses/ when watchfiles is not installed
+WATCH_POLL_INTERVAL = 2.0
+
+EXPORT_CACHE_DIR = 'responses/exports'
+
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# PDF rendering process pool: worker count, seconds a request waits before
+# answering 202, hard per-job limit, and Markdown size that always goes async
+PDF_RENDER_WORKERS = 2
+
+PDF_RENDER_WAIT = 30
+
+PDF_RENDER_TIMEOUT = 180
+
+PDF_ASYNC_THRESHOLD = 200_000
+
+# Courses prepared (and PDFs rendered) ahead of the one being written to a bulk export ZIP
+BULK_EXPORT_WINDOW = 4
+
+# Weeks of a course generated concurrently (courses have at most 8 weeks)
+WEEK_CONCURRENCY = 8
+
+# Per-key Gemini quotas: requests and tokens per minute, and the token estimate
+# reserved for a call until its actual usage is known
+KEY_RPM_LIMIT = 60
+
+KEY_TPM_LIMIT = 1_000_000
+
+KEY_TOKENS_PER_CALL = 8_000
+
+# Seconds a key rests after a 429 (doubling while they continue), after an auth
+# failure, and the error rate over KEY_ERROR_WINDOW seconds that benches a key
+KEY_COOLDOWN_SECONDS = 30
+
+KEY_REVOKED_COOLDOWN_SECONDS = 3600
+
+KEY_ERROR_WINDOW = 60
+
+KEY_ERROR_RATE_THRESHOLD = 0.5
+
+# Longest a Gemini call waits for a usable key; when every key is benched or
+# throttled for longer (e.g. all revoked), the call fails instead of waiting
+KEY_MAX_WAIT_SECONDS = 60
+
+# Shared caches of the static stage prompts: TTL (renewed while in use), seconds
+# without use after which a cache is left to expire, and models warmed at startup
+PROMPT_CACHE_TTL_SECONDS = 3600
+
+PROMPT_CACHE_IDLE_SECONDS = 6 * 3600
+
+PROMPT_CACHE_WARM_MODELS = [1]
+
+# Explicit context caching economics per MODEL_MAP id, from the Gemini price
+# list: minimum cacheable tokens, price of a cached token and of storing one
+# token for an hour (both relative to an uncached input token), and the models
+# that discount repeated prompt prefixes implicitly
+CACHE_MIN_TOKENS = {0: 4096, 1: 1024, 2: 4096}
+
+CACHED_TOKEN_RATE = {0: 0.25, 1: 0.1, 2: 0.1}
+
+CACHE_STORAGE_RATE = {0: 10.0, 1: 3.33, 2: 3.6}
+
+IMPLICIT_CACHE_MODELS = [1, 2]
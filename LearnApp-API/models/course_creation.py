@@ -25,4 +25,10 @@ class ProgressUpdate(BaseModel):
     status: int  # 0: pending, 1: started, 2: success, 3: failed
     timestamp: str | None
     path: str | None = None
-    error: str | None = None
\ No newline at end of file
+    error: str | None = None
+
+class WeekProgress(BaseModel):
+    step: str = "course_weeks"
+    week_number: int
+    weeks_completed: int
+    total_weeks: int
@@ -1,10 +1,11 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
+# Fields are optional so /studio/courses can return a `fields=` projection
 class CourseSummary(BaseModel):
-    course_id: str
-    title: str
-    overview: str
-    total_weeks: int
-    skills: List[str]
-    course_progress: float  # New field
\ No newline at end of file
+    course_id: Optional[str] = None
+    title: Optional[str] = None
+    overview: Optional[str] = None
+    total_weeks: Optional[int] = None
+    skills: Optional[List[str]] = None
+    course_progress: Optional[float] = None  # New field
\ No newline at end of file
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from services.course_store import course_store
+from services.bulk_export import bulk_exporter
+
+router = APIRouter(prefix='/admin', tags=['admin'])
+
+class BulkExportRequest(BaseModel):
+    course_ids: Optional[List[str]] = Field(None, min_length=1, description="Courses to export; the filter below when omitted")
+    title_contains: Optional[str] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    include_pdf: bool = False
+
+def to_store_timestamp(value: Optional[datetime]) -> Optional[str]:
+    """The store keeps naive UTC ISO timestamps."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+@router.post('/export')
+async def bulk_export(payload: BulkExportRequest):
+    """
+    Stream a ZIP archive of many courses for backups and migrations.
+
+    Each course is exported as <course_id>/result.json, outline.md and, with
+    include_pdf, outline.pdf; manifest.json lists the exported courses and
+    any that failed. Without course_ids, every course matching the filter
+    (all courses if no filter is set) is exported.
+    """
+    if payload.course_ids is not None:
+        course_ids = list(dict.fromkeys(payload.course_ids))
+        missing = [course_id for course_id in course_ids if not course_store.has_course(course_id)]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Courses not found: {', '.join(missing)}")
+    else:
+        course_ids = course_store.find_course_ids(
+            title_contains=payload.title_contains,
+            updated_after=to_store_timestamp(payload.updated_after),
+            updated_before=to_store_timestamp(payload.updated_before)
+        )
+        if not course_ids:
+            raise HTTPException(status_code=404, detail="No courses match the filter")
+
+    filename = f"courses_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.zip"
+    return StreamingResponse(
+        bulk_exporter.stream(course_ids, include_pdf=payload.include_pdf),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Course-Count": str(len(course_ids))}
+    )
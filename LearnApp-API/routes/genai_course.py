@@ -7,9 +7,12 @@ from pydantic import BaseModel
 from datetime import datetime
 import asyncio
 import logging
-from utils.genai import save_result, logger, MODEL_MAP
-from utils.helper import map_inputs, get_difficulty_level
-from models.course_creation import GenaiInput, ProgressUpdate
+from utils.genai import logger, MODEL_MAP
+from utils.artifact_writer import save_result
+from utils.helper import map_inputs, get_difficulty_level, assign_ids
+from models.course_creation import GenaiInput, ProgressUpdate, WeekProgress
+from services.course_writer import course_writer
+from services.progress_log import progress_log
 from services.genai_service import GenaiService
 from prompts.PROMPTS import INPUT_MAPPING
 
@@ -28,7 +31,6 @@ async def update_progress(
     step: str,
     status: int,
     progress_map: Dict[str, Any],
-    course_map: Dict[str, Any],
     response_dir: str,
     path: str | None = None,
     error: str | None = None
@@ -71,11 +73,7 @@ async def update_progress(
     await websocket.send_json(update.model_dump())
 
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map_path = "responses/1coursemaps.json"
-        await save_result(progress_map, progress_path)
-        course_map[str(request_id)] = progress_map
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map, step)
     except Exception as e:
         logger.error(f"Failed to save progress map for step {step}: {str(e)}")
         raise
@@ -89,21 +87,6 @@ async def generate_course(websocket: WebSocket):
     response_dir = f"responses/{request_id}"
     logger.info(f"Generating course for request ID: {request_id}")
 
-    # Load or create course map
-    course_map_path = "responses/1coursemaps.json"
-    course_map: Dict[str, Any] = {}
-    try:
-        if os.path.exists(course_map_path):
-            with open(course_map_path, 'r') as f:
-                course_map = json.load(f)
-        else:
-            await save_result(course_map, course_map_path)
-    except Exception as e:
-        logger.error(f"Failed to load or create course map: {str(e)}")
-        await websocket.send_json({"status": "error", "error": f"Failed to initialize course map: {str(e)}"})
-        await websocket.close()
-        return
-
     # Initialize progress map
     progress_map = {
         "course_outline": {"status": 0, "timestamp": None, "path": None, "error": None},
@@ -112,18 +95,16 @@ async def generate_course(websocket: WebSocket):
         "course_milestone": {"status": 0, "timestamp": None, "path": None, "error": None}
     }
 
-    # Save initial progress map and update course map
+    # Record initial progress map
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map[str(request_id)] = progress_map
-        await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map)
     except Exception as e:
         logger.error(f"Failed to save initial progress map: {str(e)}")
         await websocket.send_json({"status": "error", "error": f"Failed to initialize progress: {str(e)}"})
         await websocket.close()
         return
 
+    job = None
     try:
         # Receive and validate input
         input_data = await websocket.receive_json()
@@ -142,47 +123,52 @@ async def generate_course(websocket: WebSocket):
 
         result: Dict[str, Any] = {}
         service = GenaiService()
+        job = service.job(user_instruction, course_input.model_id, job_id=request_id)
 
         # Step 1: Generate course outline
         logger.info("Starting course outline generation")
-        await update_progress(websocket, request_id, "course_outline", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_outline", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['course_outline'] = await service.generate_course_outline(
-                user_instruction=user_instruction,
-                model_id=course_input.model_id,
-                response_dir=response_dir
+                response_dir=response_dir,
+                job=job
             )
             result_path = f"{response_dir}/course_outline.json"
             await save_result(result['course_outline'], result_path)
-            await update_progress(websocket, request_id, "course_outline", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_outline", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_outline", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_outline", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Step 2: Generate weekly content
         logger.info("Starting weekly content generation")
-        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, response_dir)
         await asyncio.sleep(3)
+
+        async def report_week(index: int, completed: int, total: int) -> None:
+            update = WeekProgress(week_number=index + 1, weeks_completed=completed, total_weeks=total)
+            await websocket.send_json(update.model_dump())
+
         try:
             result['course_weeks'] = await service.generate_weekly_content(
-                user_instruction=user_instruction,
-                model_id=course_input.model_id,
                 course_outline=result['course_outline'],
-                response_dir=response_dir
+                response_dir=response_dir,
+                job=job,
+                on_week_done=report_week
             )
             result_path = f"{response_dir}/course_weeks.json"
             await save_result(result['course_weeks'], result_path)
-            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Step 3: Generate weekly plans
         logger.info("Starting weekly plans generation")
-        await update_progress(websocket, request_id, "week_plans", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "week_plans", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['week_plans'] = await service.generate_weekly_plans(
@@ -191,29 +177,28 @@ async def generate_course(websocket: WebSocket):
             )
             result_path = f"{response_dir}/week_plans.json"
             await save_result(result['week_plans'], result_path)
-            await update_progress(websocket, request_id, "week_plans", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "week_plans", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "week_plans", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "week_plans", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Step 4: Generate course milestone
         logger.info("Starting course milestone generation")
-        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['course_milestone'] = await service.generate_course_milestone(
-                user_instruction=user_instruction,
-                model_id=course_input.model_id,
                 week_plans=result['week_plans'],
-                response_dir=response_dir
+                response_dir=response_dir,
+                job=job
             )
             result_path = f"{response_dir}/course_milestone.json"
             await save_result(result['course_milestone'], result_path)
-            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Transform result
@@ -226,12 +211,14 @@ async def generate_course(websocket: WebSocket):
             'model': MODEL_MAP[mapped_inputs['model_id']]
         }
 
-        # Save final progress map, course map, and transformed result
+        # Save final progress map and transformed result
         logger.info("Course generation completed")
         progress_path = f"{response_dir}/progress.json"
         await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        await asyncio.to_thread(progress_log.flush)
+        assign_ids(transformed_result)
         await save_result(transformed_result, f"{response_dir}/result.json")
+        await course_writer.save_course(request_id, transformed_result)
         await websocket.send_json({"status": "completed", "request_id": request_id, "progress_path": progress_path})
 
     except WebSocketDisconnect:
@@ -240,4 +227,8 @@ async def generate_course(websocket: WebSocket):
         logger.error(f"Course creation failed: {str(e)}")
         await websocket.send_json({"status": "error", "error": str(e)})
     finally:
+        # Caching decision and measured savings of each stage
+        if job is not None:
+            job.log_summary()
+            await job.close()
         await websocket.close()
\ No newline at end of file
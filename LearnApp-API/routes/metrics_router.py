@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from utils.artifact_writer import artifact_writer
+from services.course_store import course_store
+from services.course_writer import course_writer
+from services.cold_storage import cold_storage
+from services.course_watcher import course_watcher
+from services.pdf_export import pdf_exporter
+from services.bulk_export import bulk_exporter
+from utils.key_pool import key_pool
+from utils.prompt_cache import prompt_caches
+
+router = APIRouter(prefix='/metrics', tags=['metrics'])
+
+@router.get('')
+async def get_metrics():
+    return {
+        "artifact_writer": artifact_writer.stats(),
+        "course_cache": course_store.cache.stats(),
+        "course_writer": course_writer.stats(),
+        "cold_storage": cold_storage.stats(),
+        "course_watcher": course_watcher.stats(),
+        "pdf_export": pdf_exporter.stats(),
+        "bulk_export": bulk_exporter.stats(),
+        "key_pool": key_pool.stats(),
+        "prompt_caches": prompt_caches.stats()
+    }
@@ -6,6 +6,8 @@ from datetime import datetime
 from typing import Dict, Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
+from services.progress_log import progress_log
+from utils.artifact_writer import save_result
 import asyncio
 
 # Configure logging
@@ -25,13 +27,7 @@ class ProgressUpdate(BaseModel):
     error: str | None
     progress: int
 
-async def save_result(data: Any, path: str):
-    """Mock save_result function to write data to file."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=4)
-
-async def update_progress(websocket: WebSocket, request_id: str, step: str, status: int, progress_map: Dict[str, Any], course_map: Dict[str, Any], response_dir: str, path: str = None, error: str = None):
+async def update_progress(websocket: WebSocket, request_id: str, step: str, status: int, progress_map: Dict[str, Any], response_dir: str, path: str = None, error: str = None):
     logger.info(f"Mock updating progress for step {step}: status={status}, path={path}, error={error}")
     progress_map[step].update({
         "status": status,
@@ -53,11 +49,7 @@ async def update_progress(websocket: WebSocket, request_id: str, step: str, stat
     )
     await websocket.send_json(update.dict())
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map_path = "responses/1coursemaps.json"
-        await save_result(progress_map, progress_path)
-        course_map[str(request_id)] = progress_map
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map, step)
     except Exception as e:
         logger.error(f"Failed to save mock progress map for step {step}: {str(e)}")
         raise
@@ -71,21 +63,6 @@ async def generate_course(websocket: WebSocket):
     response_dir = f"responses/{request_id}"
     logger.info(f"Mock generating course for request ID: {request_id}")
     
-    # Load or create course map
-    course_map_path = "responses/1coursemaps.json"
-    course_map = {}
-    try:
-        if os.path.exists(course_map_path):
-            with open(course_map_path, 'r') as f:
-                course_map = json.load(f)
-        else:
-            await save_result(course_map, course_map_path)
-    except Exception as e:
-        logger.error(f"Failed to load or create mock course map: {str(e)}")
-        await websocket.send_json({"status": "error", "error": f"Failed to initialize course map: {str(e)}"})
-        await websocket.close()
-        return
-    
     # Initialize progress map
     progress_map = {
         "course_outline": {"status": 0, "timestamp": None, "path": None, "error": None},
@@ -97,12 +74,9 @@ async def generate_course(websocket: WebSocket):
         "course_milestone": {"status": 0, "timestamp": None, "path": None, "error": None}
     }
     
-    # Save initial progress map and update course map
+    # Record initial progress map
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map[str(request_id)] = progress_map
-        await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map)
     except Exception as e:
         logger.error(f"Failed to save initial mock progress map: {str(e)}")
         await websocket.send_json({"status": "error", "error": f"Failed to initialize progress: {str(e)}"})
@@ -145,93 +119,93 @@ async def generate_course(websocket: WebSocket):
         
         # Step 1: Mock course outline
         logger.info("Mock starting course outline generation")
-        await update_progress(websocket, request_id, "course_outline", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_outline", 1, progress_map, response_dir)
         await asyncio.sleep(10000)
         try:
             result_path = f"{response_dir}/course_outline.json"
             await save_result(result['course_outline'], result_path)
-            await update_progress(websocket, request_id, "course_outline", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_outline", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_outline", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_outline", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 2: Mock weekly modules
         logger.info("Mock starting weekly modules generation")
-        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/course_weeks.json"
             await save_result(result['course_weeks'], result_path)
-            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 3: Mock module blocks
         logger.info("Mock starting module blocks generation")
-        await update_progress(websocket, request_id, "module_blocks", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "module_blocks", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/module_blocks.json"
             await save_result(result['course_weeks'], result_path)
-            await update_progress(websocket, request_id, "module_blocks", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "module_blocks", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "module_blocks", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "module_blocks", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 4: Mock block metadata
         logger.info("Mock starting block metadata generation")
-        await update_progress(websocket, request_id, "block_metadata", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "block_metadata", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/block_metadata.json"
             await save_result(result['block_metadata'], result_path)
-            await update_progress(websocket, request_id, "block_metadata", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "block_metadata", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "block_metadata", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "block_metadata", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 5: Mock weekly plans
         logger.info("Mock starting weekly plans generation")
-        await update_progress(websocket, request_id, "week_plans", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "week_plans", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/week_plans.json"
             await save_result(result['week_plans'], result_path)
-            await update_progress(websocket, request_id, "week_plans", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "week_plans", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "week_plans", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "week_plans", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 6: Mock weekly milestones
         logger.info("Mock starting weekly milestones generation")
-        await update_progress(websocket, request_id, "weekly_milestones", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "weekly_milestones", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/weekly_milestones.json"
             await save_result(result['weekly_milestones'], result_path)
-            await update_progress(websocket, request_id, "weekly_milestones", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "weekly_milestones", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "weekly_milestones", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "weekly_milestones", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 7: Mock course milestone
         logger.info("Mock starting course milestone generation")
-        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/course_milestone.json"
             await save_result(result['course_milestone'], result_path)
-            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Mock transformed result in CourseSpecialization structure
@@ -318,11 +292,11 @@ async def generate_course(websocket: WebSocket):
             
             transformed_result['CourseSpecialization']['Weeks'].append(week)
         
-        # Save final mock progress map, course map, and transformed result
+        # Save final mock progress map and transformed result
         logger.info("Mock course generation completed")
         progress_path = f"{response_dir}/progress.json"
         await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        await asyncio.to_thread(progress_log.flush)
         await save_result(transformed_result, f"{response_dir}/result.json")
         await websocket.send_json({"status": "completed", "request_id": request_id, "progress_path": progress_path})
         
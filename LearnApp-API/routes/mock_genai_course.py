@@ -8,8 +8,11 @@ from pydantic import BaseModel
 from datetime import datetime
 import asyncio
 import logging
-from utils.helper import map_inputs, get_difficulty_level
+from utils.helper import map_inputs, get_difficulty_level, assign_ids
 from models.course_creation import GenaiInput, ProgressUpdate
+from services.course_writer import course_writer
+from services.progress_log import progress_log
+from utils.artifact_writer import save_result
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -20,22 +23,12 @@ logging.basicConfig(
 
 router = APIRouter(prefix="/mock-genai-courses", tags=["mock-courses"])
 
-async def save_result(data: Any, path: str) -> None:
-    try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        logger.error(f"Failed to save result to {path}: {str(e)}")
-        raise
-
 async def update_progress(
     websocket: WebSocket,
     request_id: str,
     step: str,
     status: int,
     progress_map: Dict[str, Any],
-    course_map: Dict[str, Any],
     response_dir: str,
     path: str | None = None,
     error: str | None = None
@@ -78,11 +71,7 @@ async def update_progress(
     await websocket.send_json(update.model_dump())
 
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map_path = "responses/1coursemaps.json"
-        await save_result(progress_map, progress_path)
-        course_map[str(request_id)] = progress_map
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map, step)
     except Exception as e:
         logger.error(f"Failed to save progress map for step {step}: {str(e)}")
         raise
@@ -96,21 +85,6 @@ async def generate_course(websocket: WebSocket):
     response_dir = f"responses/{request_id}"
     logger.info(f"Generating mock course for request ID: {request_id}")
 
-    # Load or create course map
-    course_map_path = "responses/1coursemaps.json"
-    course_map: Dict[str, Any] = {}
-    try:
-        if os.path.exists(course_map_path):
-            with open(course_map_path, 'r') as f:
-                course_map = json.load(f)
-        else:
-            await save_result(course_map, course_map_path)
-    except Exception as e:
-        logger.error(f"Failed to load or create course map: {str(e)}")
-        await websocket.send_json({"status": "error", "error": f"Failed to initialize course map: {str(e)}"})
-        await websocket.close()
-        return
-
     # Initialize progress map
     progress_map = {
         "course_outline": {"status": 0, "timestamp": None, "path": None, "error": None},
@@ -119,12 +93,9 @@ async def generate_course(websocket: WebSocket):
         "course_milestone": {"status": 0, "timestamp": None, "path": None, "error": None}
     }
 
-    # Save initial progress map and update course map
+    # Record initial progress map
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map[str(request_id)] = progress_map
-        await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map)
     except Exception as e:
         logger.error(f"Failed to save initial progress map: {str(e)}")
         await websocket.send_json({"status": "error", "error": f"Failed to initialize progress: {str(e)}"})
@@ -151,7 +122,7 @@ async def generate_course(websocket: WebSocket):
 
         # Mock course outline
         logger.info("Starting mock course outline generation")
-        await update_progress(websocket, request_id, "course_outline", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_outline", 1, progress_map, response_dir)
         await asyncio.sleep(2)
         try:
             result['course_outline'] = {
@@ -167,15 +138,15 @@ async def generate_course(websocket: WebSocket):
             await save_result(result['course_outline'], result_path)
             with open(f"{response_dir}/course_outline.md", 'w') as f:
                 f.write(f"# Mock Course Outline\n\n## Title: {mapped_inputs['topic']}\n## Overview: This is a mock course overview.")
-            await update_progress(websocket, request_id, "course_outline", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_outline", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(2)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_outline", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_outline", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Mock weekly content
         logger.info("Starting mock weekly content generation")
-        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, response_dir)
         await asyncio.sleep(2)
         try:
             result['course_weeks'] = [
@@ -191,29 +162,29 @@ async def generate_course(websocket: WebSocket):
             with open(f"{response_dir}/course_weeks.md", 'w') as f:
                 for week in result['course_weeks']:
                     f.write(f"## Week {week['week_number']}\nTopic: {week['week_topic']}\n")
-            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(2)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Mock weekly plans
         logger.info("Starting mock weekly plans generation")
-        await update_progress(websocket, request_id, "week_plans", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "week_plans", 1, progress_map, response_dir)
         await asyncio.sleep(2)
         try:
             result['week_plans'] = [f"Mock plan for week {i + 1}" for i in range(course_input.total_weeks)]
             result_path = f"{response_dir}/week_plans.json"
             await save_result(result['week_plans'], result_path)
-            await update_progress(websocket, request_id, "week_plans", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "week_plans", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(2)
         except Exception as e:
-            await update_progress(websocket, request_id, "week_plans", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "week_plans", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Mock course milestone
         logger.info("Starting mock course milestone generation")
-        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, response_dir)
         await asyncio.sleep(2)
         try:
             result['course_milestone'] = {
@@ -230,10 +201,10 @@ async def generate_course(websocket: WebSocket):
             }
             result_path = f"{response_dir}/course_milestone.json"
             await save_result(result['course_milestone'], result_path)
-            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(2)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, response_dir, error=str(e))
             raise
 
         # Transform result
@@ -299,12 +270,14 @@ async def generate_course(websocket: WebSocket):
             }
             transformed_result['course_outline']['weeks'].append(week)
 
-        # Save final progress map, course map, and transformed result
+        # Save final progress map and transformed result
         logger.info("Mock course generation completed")
         progress_path = f"{response_dir}/progress.json"
         await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        await asyncio.to_thread(progress_log.flush)
+        assign_ids(transformed_result)
         await save_result(transformed_result, f"{response_dir}/result.json")
+        await course_writer.save_course(request_id, transformed_result)
         await websocket.send_json({"status": "completed", "request_id": request_id, "progress_path": progress_path})
 
     except WebSocketDisconnect:
@@ -7,9 +7,12 @@ from typing import List, Dict, Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from utils.generators import format_weekly_plan, generate_block_title, generate_overall_plan
 from models.course_creation import CourseInput
+from services.course_writer import course_writer
+from services.progress_log import progress_log
 from pydantic import BaseModel
 from services.ollama_course_service import CourseService
-from utils.helper import map_inputs, save_result
+from utils.helper import map_inputs, assign_ids
+from utils.artifact_writer import save_result
 import asyncio
 
 # Configure logging
@@ -29,7 +32,7 @@ class ProgressUpdate(BaseModel):
     error: str | None
     progress: int
 
-async def update_progress(websocket: WebSocket, request_id: str, step: str, status: int, progress_map: Dict[str, Any], course_map: Dict[str, Any], response_dir: str, path: str = None, error: str = None):
+async def update_progress(websocket: WebSocket, request_id: str, step: str, status: int, progress_map: Dict[str, Any], response_dir: str, path: str = None, error: str = None):
     logger.info(f"Updating progress for step {step}: status={status}, path={path}, error={error}")
     progress_map[step].update({
         "status": status,
@@ -51,11 +54,7 @@ async def update_progress(websocket: WebSocket, request_id: str, step: str, stat
     )
     await websocket.send_json(update.dict())
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map_path = "responses/1coursemaps.json"
-        await save_result(progress_map, progress_path)
-        course_map[str(request_id)] = progress_map
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map, step)
     except Exception as e:
         logger.error(f"Failed to save progress map for step {step}: {str(e)}")
         raise
@@ -68,21 +67,6 @@ async def generate_course(websocket: WebSocket):
     response_dir = f"responses/{request_id}"
     logger.info(f"Generating course for request ID: {request_id}")
     
-    # Load or create course map
-    course_map_path = "responses/1coursemaps.json"
-    course_map = {}
-    try:
-        if os.path.exists(course_map_path):
-            with open(course_map_path, 'r') as f:
-                course_map = json.load(f)
-        else:
-            await save_result(course_map, course_map_path)
-    except Exception as e:
-        logger.error(f"Failed to load or create course map: {str(e)}")
-        await websocket.send_json({"status": "error", "error": f"Failed to initialize course map: {str(e)}"})
-        await websocket.close()
-        return
-    
     # Initialize progress map
     progress_map = {
         "course_outline": {"status": 0, "timestamp": None, "path": None, "error": None},
@@ -94,12 +78,9 @@ async def generate_course(websocket: WebSocket):
         "course_milestone": {"status": 0, "timestamp": None, "path": None, "error": None}
     }
     
-    # Save initial progress map and update course map
+    # Record initial progress map
     try:
-        progress_path = f"{response_dir}/progress.json"
-        course_map[str(request_id)] = progress_map
-        await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        progress_log.record(request_id, progress_map)
     except Exception as e:
         logger.error(f"Failed to save initial progress map: {str(e)}")
         await websocket.send_json({"status": "error", "error": f"Failed to initialize progress: {str(e)}"})
@@ -118,35 +99,35 @@ async def generate_course(websocket: WebSocket):
         
         # Step 1: Generate course outline
         logger.info("Starting course outline generation")
-        await update_progress(websocket, request_id, "course_outline", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_outline", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result_path = f"{response_dir}/course_outline.json"
             result['course_outline'] = await service.generate_course_outline(mapped_inputs, f"{response_dir}/course_outline.md")
             await save_result(result['course_outline'], result_path)
-            await update_progress(websocket, request_id, "course_outline", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_outline", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_outline", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_outline", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 2: Generate weekly modules
         logger.info("Starting weekly modules generation")
-        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_weeks", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['course_weeks'] = await service.generate_weekly_modules(result['course_outline'], mapped_inputs['motivation'], mapped_inputs['custom_motivation'], mapped_inputs['experience'], f"{response_dir}/course_weeks.md")
             result_path = f"{response_dir}/course_weeks.json"
             await save_result(result['course_weeks'], result_path)
-            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_weeks", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_weeks", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 3: Generate module blocks concurrently
         logger.info("Starting module blocks generation")
-        await update_progress(websocket, request_id, "module_blocks", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "module_blocks", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             tasks = []
@@ -174,19 +155,19 @@ async def generate_course(websocket: WebSocket):
                             week_module['WeekModules'][module_idx]['ModuleBlocks'] = blocks
                 except Exception as e:
                     logger.error(f"Error processing blocks for week {week_number}, module {module_idx}: {str(e)}")
-                    await update_progress(websocket, request_id, "module_blocks", 3, progress_map, course_map, response_dir, error=str(e))
+                    await update_progress(websocket, request_id, "module_blocks", 3, progress_map, response_dir, error=str(e))
                     raise
             result_path = f"{response_dir}/module_blocks.json"
             await save_result(result['course_weeks'], result_path)
-            await update_progress(websocket, request_id, "module_blocks", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "module_blocks", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "module_blocks", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "module_blocks", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 4: Generate block metadata concurrently
         logger.info("Starting block metadata generation")
-        await update_progress(websocket, request_id, "block_metadata", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "block_metadata", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['block_metadata'] = []
@@ -214,33 +195,33 @@ async def generate_course(websocket: WebSocket):
                             result['block_metadata'].append(metadata)
                 except Exception as e:
                     logger.error(f"Error processing metadata for week {week_number}, module {module_idx}: {str(e)}")
-                    await update_progress(websocket, request_id, "block_metadata", 3, progress_map, course_map, response_dir, error=str(e))
+                    await update_progress(websocket, request_id, "block_metadata", 3, progress_map, response_dir, error=str(e))
                     raise
             result_path = f"{response_dir}/block_metadata.json"
             await save_result(result['block_metadata'], result_path)
-            await update_progress(websocket, request_id, "block_metadata", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "block_metadata", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "block_metadata", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "block_metadata", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 5: Generate weekly plans
         logger.info("Starting weekly plans generation")
-        await update_progress(websocket, request_id, "week_plans", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "week_plans", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['week_plans'] = [format_weekly_plan(week_module) for week_module in result['course_weeks']]
             result_path = f"{response_dir}/week_plans.json"
             await save_result(result['week_plans'], result_path)
-            await update_progress(websocket, request_id, "week_plans", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "week_plans", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "week_plans", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "week_plans", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 6: Generate weekly milestones concurrently
         logger.info("Starting weekly milestones generation")
-        await update_progress(websocket, request_id, "weekly_milestones", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "weekly_milestones", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             result['weekly_milestones'] = [None] * len(result['week_plans'])
@@ -263,29 +244,29 @@ async def generate_course(websocket: WebSocket):
                     result['weekly_milestones'][week_number] = milestone
                 except Exception as e:
                     logger.error(f"Error processing milestone for week {week_number + 1}: {str(e)}")
-                    await update_progress(websocket, request_id, "weekly_milestones", 3, progress_map, course_map, response_dir, error=str(e))
+                    await update_progress(websocket, request_id, "weekly_milestones", 3, progress_map, response_dir, error=str(e))
                     raise
             result_path = f"{response_dir}/weekly_milestones.json"
             await save_result(result['weekly_milestones'], result_path)
-            await update_progress(websocket, request_id, "weekly_milestones", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "weekly_milestones", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "weekly_milestones", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "weekly_milestones", 3, progress_map, response_dir, error=str(e))
             raise
         
         # Step 7: Generate course milestone
         logger.info("Starting course milestone generation")
-        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, course_map, response_dir)
+        await update_progress(websocket, request_id, "course_milestone", 1, progress_map, response_dir)
         await asyncio.sleep(3)
         try:
             overall_plan = generate_overall_plan(result['week_plans'])
             result['course_milestone'] = await service.generate_course_milestone(overall_plan, mapped_inputs['experience'], mapped_inputs['motivation'], response_dir)
             result_path = f"{response_dir}/course_milestone.json"
             await save_result(result['course_milestone'], result_path)
-            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, course_map, response_dir, path=result_path)
+            await update_progress(websocket, request_id, "course_milestone", 2, progress_map, response_dir, path=result_path)
             await asyncio.sleep(3)
         except Exception as e:
-            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, course_map, response_dir, error=str(e))
+            await update_progress(websocket, request_id, "course_milestone", 3, progress_map, response_dir, error=str(e))
             raise
         
         transformed_result = {
@@ -385,12 +366,14 @@ async def generate_course(websocket: WebSocket):
             "model" : "gemma"
         }
             
-        # Save final progress map, course map, and transformed result
+        # Save final progress map and transformed result
         logger.info("Course generation completed")
         progress_path = f"{response_dir}/progress.json"
         await save_result(progress_map, progress_path)
-        await save_result(course_map, course_map_path)
+        await asyncio.to_thread(progress_log.flush)
+        assign_ids(transformed_result)
         await save_result(transformed_result, f"{response_dir}/result.json")
+        await course_writer.save_course(request_id, transformed_result)
         await websocket.send_json({"status": "completed", "request_id": request_id, "progress_path": progress_path})
         
     except WebSocketDisconnect:
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 import json
-import os
-from typing import List, Dict
-from pydantic import BaseModel
+import base64
+from typing import List, Dict, Literal, Optional
+from pydantic import BaseModel, Field
 from models.studio_models import CourseSummary
+from services.course_store import course_store
+from services.course_writer import course_writer
+from services.cold_storage import cold_storage
+from utils.helper import iter_course_markdown, iter_scope_markdown
+from utils.http_cache import make_etag, etag_matches, cache_headers, not_modified, IMMUTABLE
 import time
 from google import genai
-from config.config import API_KEYS
+from utils.key_pool import NoUsableKeyError, key_pool
 from prompts.tutor_prompt import TUTOR_SYSTEM
 from ollama import Client as OllamaClient
-import random
 from datetime import datetime
 
 
@@ -20,99 +25,127 @@ class CourseResponse(BaseModel):
     course_milestone: Dict
     course_id: str
     
-class BlockUpdateRequest(BaseModel):
-    course_id: str
-    week_name: str
-    module_name: str
-    block_name: str
+class BlockUpdate(BaseModel):
+    block_id: Optional[str] = None
+    week_name: Optional[str] = None
+    module_name: Optional[str] = None
+    block_name: Optional[str] = None
     update: bool
+
+class BlockUpdateRequest(BlockUpdate):
+    course_id: str
+
+class BatchBlockUpdateRequest(BaseModel):
+    course_id: str
+    updates: List[BlockUpdate] = Field(..., min_length=1)
     
 class BlockAccessRequest(BaseModel):
     course_id: str
-    week_name: str
-    module_name: str
-    block_name: str
-
-@router.get("/courses", response_model=List[CourseSummary])
-async def get_course_summaries():
-    responses_dir = "responses"
-    summaries = []
-
-    if not os.path.exists(responses_dir):
-        raise HTTPException(status_code=404, detail="Responses directory not found.")
-
-    course_keys = [
-        name for name in os.listdir(responses_dir)
-        if os.path.isdir(os.path.join(responses_dir, name))
-    ]
-    print(course_keys)
-    
-    summaries = []
-    
-    for course_id in course_keys:
-        result_path = f"responses/{course_id}/result.json"
-        
-        if os.path.exists(result_path):
-            print("EXISTS")
-            try:
-                with open(result_path, "r") as f:
-                    course_data = json.load(f)
-                    
-                total_blocks = 0
-                completed_blocks = 0
-                course_outline = course_data['course_outline']
-                for week in course_outline.get("weeks", []):
-                    for module in week.get("week_modules", []):
-                        for block in module.get("content_blocks", []):
-                            total_blocks += 1
-                            if block.get("completed", False):
-                                completed_blocks += 1
-
-                course_progress = round((completed_blocks / total_blocks) * 100, 2) if total_blocks > 0 else 0.0
-                print(completed_blocks, total_blocks)
-
-                
-                course_outline = course_data.get("course_outline", {})
-                
-                summary = CourseSummary(
-                    course_id=course_id,
-                    title=course_outline.get("title", ""),
-                    overview=course_outline.get("overview", ""),
-                    total_weeks=course_outline.get("total_weeks", 0),
-                    skills=course_outline.get("skills", []),
-                    course_progress=course_progress
-                )
-                summaries.append(summary)
-            except Exception:
-                continue
-    
-    return summaries
+    block_id: Optional[str] = None
+    week_name: Optional[str] = None
+    module_name: Optional[str] = None
+    block_name: Optional[str] = None
+    chat_limit: int = Field(50, ge=0, description="Number of most recent tutor exchanges to return")
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+def export_filename(course_id: str, week_id: Optional[str], module_id: Optional[str], extension: str) -> str:
+    scope = f"_module{module_id}" if module_id else f"_week{week_id}" if week_id else ""
+    return f"{course_id}{scope}_outline.{extension}"
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        value, course_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return value, course_id
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/courses", response_model=List[CourseSummary], response_model_exclude_unset=True)
+async def get_course_summaries(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; all courses when omitted"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    sort: Literal["created", "title", "progress"] = "created",
+    order: Literal["asc", "desc"] = "asc",
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. course_id,title")
+):
+    requested = None
+    if fields:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(CourseSummary.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    after = decode_cursor(cursor) if cursor else None
+
+    # The query string is part of the URL, so one catalog-wide validator covers every page and projection
+    etag = make_etag(course_store.epoch, "catalog", course_store.catalog_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        columns = None
+        if requested is not None:
+            columns = list(requested - {"course_progress"})
+            if "course_progress" in requested:
+                columns += ["total_blocks", "completed_blocks"]
+        rows, next_key = course_store.page_course_summaries(
+            sort=sort, descending=order == "desc", limit=limit, after=after, fields=columns
+        )
+
+        summaries = []
+        for row in rows:
+            values = {
+                field: row[field]
+                for field in ("course_id", "title", "overview", "total_weeks", "skills") if field in row
+            }
+            if requested is None or "course_progress" in requested:
+                total_blocks = row["total_blocks"]
+                completed_blocks = row["completed_blocks"]
+                values["course_progress"] = round((completed_blocks / total_blocks) * 100, 2) if total_blocks > 0 else 0.0
+            summaries.append(CourseSummary(**values))
+        if next_key is not None:
+            response.headers["X-Next-Cursor"] = encode_cursor(next_key)
+        response.headers.update(cache_headers(etag))
+        return summaries
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @router.get("/course/{folder_id}", response_model=CourseResponse)
-async def get_course_data(folder_id: str):
-    file_path = f"responses/{folder_id}/result.json"
-    print(folder_id)
-    
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Folder or result.json not found")
+async def get_course_data(folder_id: str, request: Request, response: Response):
+    await cold_storage.ensure_live(folder_id)
+    version = course_store.course_version(folder_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    etag = make_etag(course_store.epoch, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Only titles, lengths and flags are rendered here; week payloads are fetched on demand
+    data = course_store.load_course_skeleton(folder_id)
+
+    if data is None:
+        raise HTTPException(status_code=404, detail="Course not found")
     
     try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-        
         course_data = data.get("course_outline", {})
         weeks_response = []
         
         for week in course_data.get("weeks", []):
             week_data = {
+                "week_id": week.get("id"),
                 "week_topic": week.get("week_topic", ""),
                 "week_hours": week.get("hours_per_week", 0),
                 "modules": [
                     {
+                        "module_id": module.get("id"),
                         "module_name": module.get("module_title", ""),
                         "module_hours": module.get("duration_hours", 0),
                         "blocks": [
                             {
+                                "block_id": block.get("id"),
                                 "block_name": block.get("block_title", ""),
                                 "block_minutes": block.get("length", 0),
                                 "completed": block.get("completed", False)
@@ -132,92 +165,131 @@ async def get_course_data(folder_id: str):
             "milestone_minutes": course_data.get("course_milestone", {}).get("length", "0")
         }
         
+        response.headers.update(cache_headers(etag))
         return {
             "weeks": weeks_response,
             "course_milestone": course_milestone,
             "course_id": folder_id
         }
     
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON format in result.json")
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
     
-@router.put('/update-blocks')
-async def update_blocks(payload: BlockUpdateRequest):
-    try:
-        file_path = f"responses/{payload.course_id}/result.json"
-
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Folder or result.json not found")
-
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-
-        # Locate the week
-        week = next((w for w in data['course_outline']['weeks'] if w['week_topic'] == payload.week_name), None)
-        if not week:
-            raise HTTPException(status_code=404, detail=f"Week '{payload.week_name}' not found.")
-
-        # Locate the module
-        module = next((m for m in week['week_modules'] if m['module_title'] == payload.module_name), None)
-        if not module:
-            raise HTTPException(status_code=404, detail=f"Module '{payload.module_name}' not found.")
-
-        # Locate the block
-        block = next((b for b in module['content_blocks'] if b['block_title'] == payload.block_name), None)
-        if not block:
-            raise HTTPException(status_code=404, detail=f"Block '{payload.block_name}' not found.")
+@router.get("/course/{folder_id}/week/{week_id}")
+async def get_week_data(folder_id: str, week_id: str, request: Request, response: Response):
+    await cold_storage.ensure_live(folder_id)
+    version = course_store.course_version(folder_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    etag = make_etag(course_store.epoch, version, week_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    week = course_store.load_week(folder_id, week_id)
+    if week is None:
+        raise HTTPException(status_code=404, detail="Week not found")
+    response.headers.update(cache_headers(etag))
+    return week
+
+@router.get("/course/{folder_id}/markdown")
+async def get_course_markdown(
+    folder_id: str,
+    request: Request,
+    week_id: Optional[str] = Query(None, description="Export only this week"),
+    module_id: Optional[str] = Query(None, description="Export only this module")
+):
+    """
+    Stream a course outline, or one week or module of it, as Markdown.
 
-        # Update block status
-        block['completed'] = payload.update
+    The document is rendered week by week while it is sent, so the first
+    bytes go out right away and memory stays flat however large the course is.
+    """
+    await cold_storage.ensure_live(folder_id)
+    version = course_store.course_version(folder_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    etag = make_etag(course_store.epoch, version, "markdown", week_id or "", module_id or "")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if week_id is None and module_id is None:
+        course_data = course_store.stream_course(folder_id)
+        if course_data is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        chunks = iter_course_markdown(course_data)
+    else:
+        try:
+            scope = course_store.load_scope(folder_id, week_id, module_id)
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        chunks = iter_scope_markdown(scope["title"], scope["week"], scope["module"])
+    return StreamingResponse(
+        chunks,
+        media_type="text/markdown; charset=utf-8",
+        headers={
+            **cache_headers(etag),
+            "Content-Disposition": f'inline; filename="{export_filename(folder_id, week_id, module_id, "md")}"'
+        }
+    )
 
-        # Save back to file
-        with open(file_path, 'w') as file:
-            json.dump(data, file, indent=4)
+@router.put('/update-blocks/batch')
+async def update_blocks_batch(payload: BatchBlockUpdateRequest):
+    try:
+        await cold_storage.ensure_live(payload.course_id)
+        # Resolve every block first so an unknown one rejects the batch before anything is written
+        updates = {}
+        for item in payload.updates:
+            block = course_store.find_block(
+                payload.course_id, item.week_name, item.module_name, item.block_name, block_uid=item.block_id
+            )
+            updates[block["block_id"]] = item.update
+        counts = await course_writer.set_blocks_completed(payload.course_id, list(updates.items()))
 
-        return {"message": "Block status updated successfully."}
+        total_blocks = counts["total_blocks"]
+        return {
+            "message": "Block statuses updated successfully.",
+            **counts,
+            "course_progress": round((counts["completed_blocks"] / total_blocks) * 100, 2) if total_blocks > 0 else 0.0
+        }
 
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@router.put('/update-blocks')
+async def update_blocks(payload: BlockUpdateRequest):
+    await update_blocks_batch(BatchBlockUpdateRequest(
+        course_id=payload.course_id,
+        updates=[BlockUpdate(**payload.model_dump(exclude={"course_id"}))]
+    ))
+    return {"message": "Block status updated successfully."}
     
 
 @router.patch('/get-block-details')
 async def get_block_details(payload: BlockAccessRequest):
     try:
-        file_path = f"responses/{payload.course_id}/result.json"
-
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Folder or result.json not found")
-
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-
-        # Locate the week
-        week = next((w for w in data['course_outline']['weeks'] if w['week_topic'] == payload.week_name), None)
-        if not week:
-            raise HTTPException(status_code=404, detail=f"Week '{payload.week_name}' not found.")
-
-        # Locate the module
-        module = next((m for m in week['week_modules'] if m['module_title'] == payload.module_name), None)
-        if not module:
-            raise HTTPException(status_code=404, detail=f"Module '{payload.module_name}' not found.")
-
-        # Locate the block
-        block = next((b for b in module['content_blocks'] if b['block_title'] == payload.block_name), None)
-        if not block:
-            raise HTTPException(status_code=404, detail=f"Block '{payload.block_name}' not found.")
+        await cold_storage.ensure_live(payload.course_id)
+        block = course_store.find_block(
+            payload.course_id, payload.week_name, payload.module_name, payload.block_name, block_uid=payload.block_id
+        )
 
         objectives = block.get("objectives", [])
-        chat = block.get("chat", [])
+        # Read one extra exchange to tell the client whether older history exists
+        chat = course_store.get_chat_history(block["block_id"], limit=payload.chat_limit + 1)
+        has_more = len(chat) > payload.chat_limit
+        chat = chat[len(chat) - payload.chat_limit:] if payload.chat_limit else []
 
         return {
             "objectives": objectives if isinstance(objectives, list) else [],
-            "chat": chat if isinstance(chat, list) else []
+            "chat": chat,
+            "has_more_chat": has_more
         }
 
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=f"Error retrieving block data: {str(e)}")
@@ -227,54 +299,37 @@ class ChatModel(BaseModel):
     model_type: int
     model: str
     course_id: str
-    week_name: str
-    module_name: str
-    block_name: str
+    block_id: Optional[str] = None
+    week_name: Optional[str] = None
+    module_name: Optional[str] = None
+    block_name: Optional[str] = None
 
 
 @router.put('/chat-tutor')
 async def chat_router(chat: ChatModel):
     try:
-        file_path = f"responses/{chat.course_id}/result.json"
-
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Course result file not found.")
-
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-
-        # Locate the week/module/block
-        week = next((w for w in data['course_outline']['weeks'] if w['week_topic'] == chat.week_name), None)
-        if not week:
-            raise HTTPException(status_code=404, detail=f"Week '{chat.week_name}' not found.")
-        module = next((m for m in week['week_modules'] if m['module_title'] == chat.module_name), None)
-        if not module:
-            raise HTTPException(status_code=404, detail=f"Module '{chat.module_name}' not found.")
-        block = next((b for b in module['content_blocks'] if b['block_title'] == chat.block_name), None)
-        if not block:
-            raise HTTPException(status_code=404, detail=f"Block '{chat.block_name}' not found.")
-
-        # Initialize chat history if absent
-        if "chat" not in block or not isinstance(block["chat"], list):
-            block["chat"] = []
-
-        chat_history = block["chat"]
+        await cold_storage.ensure_live(chat.course_id)
+        block = course_store.find_block(
+            chat.course_id, chat.week_name, chat.module_name, chat.block_name, block_uid=chat.block_id
+        )
+        course_title = course_store.get_course_title(chat.course_id)
+
+        # Include up to 3 past user-AI pairs (6 messages max)
+        chat_history = course_store.get_chat_history(block["block_id"], limit=3)
         start_time_iso = datetime.utcnow().isoformat()
 
         if chat.model_type == 0:
             model_name = chat.model
-            client = genai.Client(api_key=random.choice(API_KEYS))
             
             content = f"""
-                    Course Title: {data['course_outline']['title']}
-                    Course Week: {chat.week_name}
-                    Current Module: {chat.module_name}
-                    Current Topic: {chat.block_name}
+                    Course Title: {course_title}
+                    Course Week: {block['week_topic']}
+                    Current Module: {block['module_title']}
+                    Current Topic: {block['block_title']}
                     Topic's Objectives: {block.get('objectives', [])}
                 """
 
-            # Include up to 3 past user-AI pairs (6 messages max)
-            past_pairs = [msg for msg in chat_history[-3:]]
+            past_pairs = chat_history
             chat_context = ""
             for msg in past_pairs:
                 for part in msg:
@@ -282,11 +337,13 @@ async def chat_router(chat: ChatModel):
                     chat_context += f"Message : {part['message']}\n"
 
             start_time = time.time()
-            response = client.models.generate_content(
-                model=model_name,
-                contents=content + "\n" + chat_context + "\n" + chat.query,
-                config=genai.types.GenerateContentConfig(systemInstruction=TUTOR_SYSTEM)
-            )
+            async with key_pool.lease() as lease:
+                response = await lease.client.aio.models.generate_content(
+                    model=model_name,
+                    contents=content + "\n" + chat_context + "\n" + chat.query,
+                    config=genai.types.GenerateContentConfig(systemInstruction=TUTOR_SYSTEM)
+                )
+                lease.record_usage(response)
             elapsed = round(time.time() - start_time, 2)
             reply = response.candidates[0].content.parts[0].text
 
@@ -308,7 +365,7 @@ async def chat_router(chat: ChatModel):
             raise HTTPException(status_code=400, detail="Invalid model selected.")
 
         chat_entry = [
-            [{
+            {
                 "role": "user",
                 "message": chat.query,
                 "model": chat.model,
@@ -321,14 +378,10 @@ async def chat_router(chat: ChatModel):
                 "model": chat.model,
                 "response_time": elapsed,
                 "start_time": start_time_iso
-            }]
+            }
         ]
 
-        block["chat"].extend(chat_entry)
-
-        # Save updated file
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        await course_writer.append_chat_turn(chat.course_id, block["block_id"], chat_entry)
 
         return {
             "response": reply,
@@ -337,74 +390,83 @@ async def chat_router(chat: ChatModel):
             "start_time": start_time_iso
         }
 
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except NoUsableKeyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=f"Chat tutor failed: {str(e)}")
 
 
-from utils.helper import convert_json_to_markdown
-from fastapi.responses import PlainTextResponse
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from markdown_pdf import MarkdownPdf, Section
+from fastapi.responses import FileResponse, JSONResponse
+from services.pdf_export import pdf_exporter
+from config.config import PDF_RENDER_WAIT
 import logging
 
 logger = logging.getLogger(__name__)
 
+def pdf_job_response(job: Dict, filename: str):
+    if job["status"] == "done":
+        return FileResponse(
+            path=job["path"],
+            filename=filename,
+            media_type="application/pdf",
+            # The job ID is the content hash, so this URL always serves the same bytes
+            headers=cache_headers(make_etag(job["job_id"]), IMMUTABLE)
+        )
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"PDF rendering failed: {job['error']}")
+    if job["status"] == "expired":
+        raise HTTPException(status_code=410, detail="Rendered PDF expired, export the course again")
+    status_url = f"{router.prefix}/convert/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["job_id"], "status": job["status"], "status_url": status_url},
+        headers={"Location": status_url, "Retry-After": "2"}
+    )
+
 @router.post("/convert", response_class=FileResponse)
-async def convert_course_outline(course_id: str):
+async def convert_course_outline(
+    course_id: str,
+    wait: Optional[float] = Query(None, ge=0, le=PDF_RENDER_WAIT),
+    week_id: Optional[str] = Query(None, description="Export only this week"),
+    module_id: Optional[str] = Query(None, description="Export only this module")
+):
     """
     Convert a JSON course outline to Markdown and then to PDF.
     
     Args:
-        course_id: The identifier for the course, used to locate the JSON file.
+        course_id: The identifier for the course in the course store.
+        wait: Seconds to wait for the render before answering 202 (default PDF_RENDER_WAIT).
+        week_id: Render only this week; it is cached separately from the full outline.
+        module_id: Render only this module.
     
     Returns:
-        FileResponse with the generated PDF file.
+        FileResponse with the generated PDF file, or 202 with a job to poll
+        when rendering takes longer than `wait` or the course is very large.
     
     Raises:
-        HTTPException: If the JSON file is not found or conversion fails.
+        HTTPException: If the course is not found or conversion fails.
     """
     try:
-        # Step 1: Construct path and validate
-        file_path = f"responses/{course_id}/result.json"
-
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail=f"Result file not found for course_id: {course_id}")
-
-        # Step 2: Load JSON data
-        with open(file_path, 'r') as file:
-            course_data = json.load(file)
-
-        # Step 3: Convert JSON to Markdown
-        markdown_content = convert_json_to_markdown(course_data)
-        logger.info("Successfully converted JSON to Markdown")
-
-        # Step 4: Convert Markdown to PDF
-        pdf = MarkdownPdf(toc_level=3, optimize=True)
-        pdf.meta["title"] = course_data["course_outline"]["title"]
-        pdf.meta["author"] = "Course Converter API"
-        
-        # Add Markdown content as a single section
-        pdf.add_section(Section(markdown_content, toc=True))
-        
-        # Save PDF to temporary file
-        output_path = f"temp_{course_id}_outline.pdf"
-        pdf.save(output_path)
-        logger.info(f"PDF generated at {output_path}")
-
-        # Return the PDF file
-        return FileResponse(
-            path=output_path,
-            filename=f"{course_id}_outline.pdf",
-            media_type="application/pdf"
-        )
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON format: {str(e)}")
-        raise HTTPException(status_code=400, detail="Invalid JSON format")
+        await cold_storage.ensure_live(course_id)
+        # Rendered PDFs are cached by content hash; misses render in the process pool
+        job = await pdf_exporter.export(course_id, wait=wait, week_id=week_id, module_id=module_id)
+        return pdf_job_response(job, export_filename(course_id, week_id, module_id, "pdf"))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    
-    
-    
\ No newline at end of file
+
+@router.get("/convert/jobs/{job_id}")
+async def get_convert_job(job_id: str):
+    job = pdf_exporter.job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return pdf_job_response(job, f"{job['course_id'] or job_id}_outline.pdf")
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import zipfile
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+from config.config import BULK_EXPORT_WINDOW
+from services.cold_storage import ColdStorage, cold_storage
+from services.pdf_export import PdfExporter, pdf_exporter
+from utils.helper import convert_json_to_markdown
+from utils.serializer import dumps
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+class ZipStreamBuffer:
+    """
+    Write-only sink for zipfile that hands out the bytes written so far.
+
+    It has no tell() or seek(), so zipfile writes each entry with a trailing
+    data descriptor instead of seeking back to patch its header; nothing is
+    ever rewritten once it has been drained.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class BulkExporter:
+    """
+    Streams many courses as one ZIP archive, built while it is sent.
+
+    Each course becomes <course_id>/result.json (the course with completion
+    flags and tutor chat, importable as it is), <course_id>/outline.md and
+    optionally <course_id>/outline.pdf; manifest.json at the end lists what
+    was exported and what failed. Archived courses are read from cold storage
+    without being rehydrated.
+
+    Up to `window` courses are prepared ahead of the one being written, so
+    their PDFs render in parallel across the PDF process pool while the
+    archive streams. Memory is bounded by the window, not the export size,
+    and nothing touches the disk besides the PDF export cache.
+    """
+
+    def __init__(self, cold: ColdStorage, pdf: PdfExporter, window: int = BULK_EXPORT_WINDOW):
+        self.cold = cold
+        self.pdf = pdf
+        self.window = window
+        self._stats = {
+            "exports": 0,
+            "courses": 0,
+            "failures": 0,
+            "bytes_streamed": 0
+        }
+
+    async def _prepare(self, course_id: str, include_pdf: bool) -> Dict[str, Any]:
+        course_data = await asyncio.to_thread(self.cold.export_course, course_id)
+        if course_data is None:
+            raise LookupError(f"Course '{course_id}' not found.")
+        markdown_content = await asyncio.to_thread(convert_json_to_markdown, course_data)
+        entry = {"result": dumps(course_data), "markdown": markdown_content.encode("utf-8"), "pdf": None}
+        if include_pdf:
+            job = await self.pdf.render(course_id, markdown_content, course_data["course_outline"]["title"])
+            if job["status"] != "done":
+                raise RuntimeError(f"PDF rendering {job['status']}: {job['error']}")
+            entry["pdf"] = job["path"]
+        return entry
+
+    @staticmethod
+    def _write_course(archive: zipfile.ZipFile, course_id: str, entry: Dict[str, Any]) -> None:
+        if entry["pdf"] is not None:
+            # First, so a PDF evicted from the export cache meanwhile fails the course before
+            # anything of it is written. PDFs are compressed already; copied in chunks.
+            archive.write(entry["pdf"], f"{course_id}/outline.pdf", compress_type=zipfile.ZIP_STORED)
+        archive.writestr(f"{course_id}/result.json", entry["result"])
+        archive.writestr(f"{course_id}/outline.md", entry["markdown"])
+
+    async def stream(self, course_ids: List[str], include_pdf: bool = False) -> AsyncIterator[bytes]:
+        """
+        Build the ZIP archive of `course_ids`, yielding it chunk by chunk.
+
+        A course that fails to export is recorded in manifest.json instead of
+        aborting the archive.
+
+        Args:
+            course_ids: Courses to export, in archive order.
+            include_pdf: Add a rendered PDF outline for each course.
+
+        Yields:
+            Consecutive chunks of the ZIP file.
+        """
+        buffer = ZipStreamBuffer()
+        archive = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED)
+        pending = iter(course_ids)
+        window: "deque[tuple]" = deque()
+        manifest: Dict[str, Any] = {
+            "created_at": datetime.utcnow().isoformat(),
+            "include_pdf": include_pdf,
+            "courses": [],
+            "errors": {}
+        }
+        self._stats["exports"] += 1
+
+        def fill() -> None:
+            while len(window) < self.window:
+                course_id = next(pending, None)
+                if course_id is None:
+                    return
+                window.append((course_id, asyncio.create_task(self._prepare(course_id, include_pdf))))
+
+        try:
+            fill()
+            while window:
+                course_id, task = window.popleft()
+                fill()
+                try:
+                    entry = await task
+                    await asyncio.to_thread(self._write_course, archive, course_id, entry)
+                except Exception as e:
+                    manifest["errors"][course_id] = str(e) or type(e).__name__
+                    self._stats["failures"] += 1
+                    logger.error(f"Bulk export skipped course {course_id}: {manifest['errors'][course_id]}")
+                    continue
+                manifest["courses"].append(course_id)
+                self._stats["courses"] += 1
+                chunk = buffer.drain()
+                self._stats["bytes_streamed"] += len(chunk)
+                yield chunk
+
+            archive.writestr("manifest.json", dumps(manifest, indent=2))
+            archive.close()
+            chunk = buffer.drain()
+            self._stats["bytes_streamed"] += len(chunk)
+            yield chunk
+            logger.info(f"Bulk export of {len(manifest['courses'])} courses finished, {len(manifest['errors'])} failed")
+        finally:
+            # Client went away mid-archive: stop preparing courses (shared PDF jobs keep running)
+            for _, task in window:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "window": self.window}
+
+
+bulk_exporter = BulkExporter(cold_storage, pdf_exporter)
@@ -0,0 +1,266 @@
+import io
+import os
+import asyncio
+import copy
+import time
+import shutil
+import tarfile
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from config.config import RESPONSES_DIR, ARCHIVE_DIR, COLD_AFTER_DAYS
+from services.course_store import CourseStore, course_store
+from utils.serializer import dumps, load_file, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single worker assumed
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Archive member holding the course as stored (content, completion flags and chat)
+SNAPSHOT_MEMBER = "course_store.json"
+
+
+class ColdStorage:
+    """
+    Compressed cold tier for courses nobody has touched in a while.
+
+    Archiving packs responses/<course_id>/ together with a snapshot of the
+    course's store rows into one gzip tarball under ARCHIVE_DIR, then removes
+    the directory and the content rows. The courses row stays, so the
+    dashboard still lists the course. Routes call ensure_live() before they
+    read or write a course's content, which unpacks an archived course again
+    in a worker thread.
+
+    Archiving and rehydrating a course hold a lock file next to its archive,
+    so uvicorn workers never run them on the same course at once. Writes do
+    not take that lock; instead the content rows are only dropped if the
+    course's updated_at still matches the snapshot, otherwise the archive is
+    abandoned and the course stays live.
+    """
+
+    def __init__(self, store: CourseStore, responses_dir: str = RESPONSES_DIR, archive_dir: str = ARCHIVE_DIR):
+        self.store = store
+        self.responses_dir = responses_dir
+        self.archive_dir = archive_dir
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats = {
+            "archived": 0,
+            "bytes_before": 0,
+            "bytes_after": 0,
+            "rehydrations": 0,
+            "total_rehydration_ms": 0.0,
+            "max_rehydration_ms": 0.0
+        }
+
+    def _archive_path(self, course_id: str) -> str:
+        return os.path.join(self.archive_dir, f"{course_id}.tar.gz")
+
+    def _lock(self, course_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(course_id, threading.Lock())
+
+    @contextmanager
+    def _course_lock(self, course_id: str) -> Iterator[None]:
+        # The thread lock orders this worker's callers; the flock the other workers
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with self._lock(course_id), open(os.path.join(self.archive_dir, f"{course_id}.lock"), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def export_course(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A course document with each block's chat embedded, as save_course accepts it.
+
+        An archived course is read from its archive without being rehydrated.
+
+        Returns:
+            The course document (a private copy), or None if the course does not exist.
+        """
+        if self.store.is_archived(course_id):
+            return self.read_snapshot(course_id)["course"]
+        if self.store.load_course(course_id) is None:
+            return None
+        return self._snapshot(course_id, None)["course"]
+
+    def read_snapshot(self, course_id: str) -> Dict[str, Any]:
+        """Snapshot stored in a course's archive, without restoring anything."""
+        with tarfile.open(self._archive_path(course_id), "r:gz") as tar:
+            names = tar.getnames()
+            if SNAPSHOT_MEMBER in names:
+                return loads(tar.extractfile(SNAPSHOT_MEMBER).read())
+            result_member = f"{course_id}/result.json"
+            if result_member not in names:
+                raise LookupError(f"Archive of course '{course_id}' holds no course document.")
+            return {"created_at": None, "course": loads(tar.extractfile(result_member).read())}
+
+    def _snapshot(self, course_id: str, created_at: Optional[str]) -> Dict[str, Any]:
+        """The course document with each block's chat embedded, as save_course accepts it."""
+        course_data = copy.deepcopy(self.store.load_course(course_id))
+        block_ids = self.store.block_ids(course_id)
+        for week in course_data["course_outline"].get("weeks", []):
+            for module in week.get("week_modules", []):
+                for block in module.get("content_blocks", []):
+                    chat = self.store.get_chat_history(block_ids[block["id"]])
+                    if chat:
+                        block["chat"] = chat
+        return {"created_at": created_at, "course": course_data}
+
+    def archive(self, course_id: str, created_at: str) -> Optional[Dict[str, int]]:
+        """
+        Move one course to the cold tier.
+
+        Returns:
+            Bytes used by the course directory before and by the archive after,
+            or None if the course was written to meanwhile (or is already
+            archived) and stays live.
+        """
+        course_dir = os.path.join(self.responses_dir, course_id)
+        archive_path = self._archive_path(course_id)
+
+        with self._course_lock(course_id):
+            if self.store.is_archived(course_id):
+                return None
+            updated_at = self.store.course_updated_at(course_id)
+            snapshot = dumps(self._snapshot(course_id, created_at))
+            bytes_before = len(snapshot)
+            tmp_path = f"{archive_path}.tmp"
+            with tarfile.open(tmp_path, "w:gz") as tar:
+                info = tarfile.TarInfo(SNAPSHOT_MEMBER)
+                info.size = len(snapshot)
+                info.mtime = int(time.time())
+                tar.addfile(info, io.BytesIO(snapshot))
+                if os.path.isdir(course_dir):
+                    for root, _, files in os.walk(course_dir):
+                        for name in files:
+                            path = os.path.join(root, name)
+                            bytes_before += os.path.getsize(path)
+                            tar.add(path, arcname=os.path.relpath(path, self.responses_dir))
+            os.replace(tmp_path, archive_path)
+
+            # The archive is complete before anything is removed
+            if not self.store.archive_course_rows(course_id, updated_at):
+                os.remove(archive_path)
+                logger.info(f"Course {course_id} was written to while being archived, keeping it live")
+                return None
+            if os.path.isdir(course_dir):
+                shutil.rmtree(course_dir)
+
+        bytes_after = os.path.getsize(archive_path)
+        self._stats["archived"] += 1
+        self._stats["bytes_before"] += bytes_before
+        self._stats["bytes_after"] += bytes_after
+        logger.info(f"Archived course {course_id}: {bytes_before} -> {bytes_after} bytes")
+        return {"bytes_before": bytes_before, "bytes_after": bytes_after}
+
+    def archive_inactive(self, days: int = COLD_AFTER_DAYS) -> Dict[str, Any]:
+        """
+        Archive every course without writes or tutor chat in the last `days` days.
+
+        Returns:
+            Report with the archived course IDs and the space saved.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        archived: List[str] = []
+        bytes_before = bytes_after = 0
+        for course in self.store.list_cold_courses(cutoff):
+            try:
+                sizes = self.archive(course["course_id"], course["created_at"])
+            except Exception as e:
+                logger.error(f"Failed to archive course {course['course_id']}: {str(e)}")
+                continue
+            if sizes is None:
+                continue
+            archived.append(course["course_id"])
+            bytes_before += sizes["bytes_before"]
+            bytes_after += sizes["bytes_after"]
+        return {
+            "archived": archived,
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after
+        }
+
+    async def ensure_live(self, course_id: str) -> None:
+        """Rehydrate a course in a worker thread if it is archived; a no-op otherwise."""
+        if self.store.is_archived(course_id):
+            await asyncio.to_thread(self.rehydrate, course_id)
+
+    def rehydrate(self, course_id: str) -> Optional[float]:
+        """
+        Restore an archived course's directory and store rows.
+
+        Returns:
+            Rehydration time in milliseconds, or None if another caller already restored it.
+        """
+        archive_path = self._archive_path(course_id)
+        with self._course_lock(course_id):
+            # Another worker may have restored it while we waited for the lock
+            if not self.store.is_archived(course_id):
+                return None
+            start = time.perf_counter()
+            root = os.path.realpath(self.responses_dir)
+            snapshot = None
+            with tarfile.open(archive_path, "r:gz") as tar:
+                for member in tar.getmembers():
+                    if not member.isfile():
+                        continue
+                    data = tar.extractfile(member).read()
+                    if member.name == SNAPSHOT_MEMBER:
+                        snapshot = loads(data)
+                        continue
+                    target = os.path.realpath(os.path.join(root, member.name))
+                    if not target.startswith(os.path.join(root, course_id) + os.sep):
+                        logger.warning(f"Skipping unexpected member {member.name} in {archive_path}")
+                        continue
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, 'wb') as f:
+                        f.write(data)
+
+            if snapshot is None:
+                # Archive without a snapshot: fall back to the restored result.json
+                snapshot = {"created_at": None, "course": load_file(os.path.join(root, course_id, "result.json"))}
+            self.store.save_course(course_id, snapshot["course"], created_at=snapshot["created_at"])
+            os.remove(archive_path)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._stats["rehydrations"] += 1
+        self._stats["total_rehydration_ms"] += elapsed_ms
+        self._stats["max_rehydration_ms"] = max(self._stats["max_rehydration_ms"], elapsed_ms)
+        logger.info(f"Rehydrated course {course_id} in {elapsed_ms:.1f} ms")
+        return elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        rehydrations = self._stats["rehydrations"]
+        return {
+            **self._stats,
+            "bytes_saved": self._stats["bytes_before"] - self._stats["bytes_after"],
+            "total_rehydration_ms": round(self._stats["total_rehydration_ms"], 2),
+            "max_rehydration_ms": round(self._stats["max_rehydration_ms"], 2),
+            "avg_rehydration_ms": round(self._stats["total_rehydration_ms"] / rehydrations, 2) if rehydrations else 0.0
+        }
+
+
+cold_storage = ColdStorage(course_store)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move inactive courses to compressed cold storage")
+    parser.add_argument("--days", type=int, default=COLD_AFTER_DAYS, help="archive courses untouched for this many days")
+    args = parser.parse_args()
+    report = cold_storage.archive_inactive(args.days)
+    print(f"Archived {len(report['archived'])} courses, saved {report['bytes_saved']} bytes "
+          f"({report['bytes_before']} -> {report['bytes_after']})")
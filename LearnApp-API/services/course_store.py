@@ -0,0 +1,1258 @@
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config.config import COURSE_DB_PATH, RESPONSES_DIR, COURSE_CACHE_SIZE, ARTIFACT_INDENT
+from utils.course_cache import CourseCache
+from utils.helper import assign_ids
+from utils.serializer import dumps, dumps_str, loads, load_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single worker assumed
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    course_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    overview TEXT NOT NULL DEFAULT '',
+    total_weeks INTEGER NOT NULL DEFAULT 0,
+    prerequisites TEXT NOT NULL DEFAULT '[]',
+    learning_outcomes TEXT NOT NULL DEFAULT '[]',
+    skills TEXT NOT NULL DEFAULT '[]',
+    user_requirement TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    total_blocks INTEGER NOT NULL DEFAULT 0,
+    completed_blocks INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS weeks (
+    week_id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    uid TEXT,
+    week_number INTEGER,
+    week_topic TEXT NOT NULL,
+    hours_per_week REAL
+);
+
+CREATE TABLE IF NOT EXISTS modules (
+    module_id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    week_id INTEGER NOT NULL REFERENCES weeks(week_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    uid TEXT,
+    module_title TEXT NOT NULL,
+    duration_hours REAL
+);
+
+CREATE TABLE IF NOT EXISTS blocks (
+    block_id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    module_id INTEGER NOT NULL REFERENCES modules(module_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    uid TEXT,
+    block_title TEXT NOT NULL,
+    length,
+    type TEXT,
+    objectives TEXT NOT NULL DEFAULT '[]',
+    "references" TEXT NOT NULL DEFAULT '[]',
+    completed INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS milestones (
+    milestone_id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    week_id INTEGER REFERENCES weeks(week_id) ON DELETE CASCADE,
+    milestone_title TEXT NOT NULL DEFAULT '',
+    description TEXT,
+    length,
+    type TEXT,
+    objectives TEXT NOT NULL DEFAULT '[]',
+    prerequisites TEXT NOT NULL DEFAULT '[]',
+    deliverables TEXT NOT NULL DEFAULT '[]',
+    upload_required TEXT,
+    supported_filetypes TEXT NOT NULL DEFAULT '[]',
+    "references" TEXT NOT NULL DEFAULT '[]'
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- epoch identifies this database, so versions from a recreated store never collide
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('epoch', lower(hex(randomblob(8))));
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('catalog_version', '0');
+
+CREATE TABLE IF NOT EXISTS chat_turns (
+    turn_id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    block_id INTEGER NOT NULL REFERENCES blocks(block_id) ON DELETE CASCADE,
+    query TEXT NOT NULL,
+    reply TEXT NOT NULL,
+    model TEXT,
+    response_time REAL,
+    start_time TEXT
+);
+"""
+
+# Created after COLUMN_MIGRATIONS so indexes on added columns exist on old databases too
+INDEXES = """
+DROP INDEX IF EXISTS idx_courses_created;
+CREATE INDEX IF NOT EXISTS idx_courses_created_id ON courses(created_at, course_id);
+CREATE INDEX IF NOT EXISTS idx_courses_title ON courses(title, course_id);
+CREATE INDEX IF NOT EXISTS idx_courses_progress ON courses((CASE WHEN total_blocks > 0 THEN CAST(completed_blocks AS REAL) / total_blocks ELSE 0 END), course_id);
+CREATE INDEX IF NOT EXISTS idx_courses_updated ON courses(updated_at);
+CREATE INDEX IF NOT EXISTS idx_weeks_course ON weeks(course_id, week_topic);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_weeks_uid ON weeks(course_id, uid);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_modules_uid ON modules(course_id, uid);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_blocks_uid ON blocks(course_id, uid);
+CREATE INDEX IF NOT EXISTS idx_modules_course ON modules(course_id);
+CREATE INDEX IF NOT EXISTS idx_modules_week ON modules(week_id, module_title);
+CREATE INDEX IF NOT EXISTS idx_blocks_course ON blocks(course_id);
+CREATE INDEX IF NOT EXISTS idx_blocks_module ON blocks(module_id, block_title);
+CREATE INDEX IF NOT EXISTS idx_milestones_course ON milestones(course_id, week_id);
+CREATE INDEX IF NOT EXISTS idx_chat_turns_block ON chat_turns(block_id, turn_id);
+CREATE INDEX IF NOT EXISTS idx_chat_turns_course ON chat_turns(course_id);
+"""
+
+# Columns added after the first release of the schema: (table, column, definition, backfill)
+COLUMN_MIGRATIONS = [
+    ("courses", "version", "INTEGER NOT NULL DEFAULT 0", None),
+    (
+        "courses", "total_blocks", "INTEGER NOT NULL DEFAULT 0",
+        "UPDATE courses SET total_blocks = (SELECT COUNT(*) FROM blocks b WHERE b.course_id = courses.course_id)"
+    ),
+    (
+        "courses", "completed_blocks", "INTEGER NOT NULL DEFAULT 0",
+        "UPDATE courses SET completed_blocks = (SELECT COUNT(*) FROM blocks b WHERE b.course_id = courses.course_id AND b.completed = 1)"
+    ),
+    ("weeks", "uid", "TEXT", "UPDATE weeks SET uid = CAST(position + 1 AS TEXT)"),
+    (
+        "modules", "uid", "TEXT",
+        "UPDATE modules SET uid = (SELECT w.uid FROM weeks w WHERE w.week_id = modules.week_id) || '.' || (position + 1)"
+    ),
+    (
+        "blocks", "uid", "TEXT",
+        "UPDATE blocks SET uid = (SELECT m.uid FROM modules m WHERE m.module_id = blocks.module_id) || '.' || (position + 1)"
+    ),
+    ("courses", "archived_at", "TEXT", None),
+]
+
+MILESTONE_TEXT_FIELDS = ["milestone_title", "description", "length", "type"]
+MILESTONE_JSON_FIELDS = [
+    "objectives", "prerequisites", "deliverables", "upload_required",
+    "supported_filetypes", "references"
+]
+
+# Sort keys of the course summary list; each has a matching (expression, course_id) index
+SUMMARY_SORT_KEYS = {
+    "created": "created_at",
+    "title": "title",
+    "progress": "(CASE WHEN total_blocks > 0 THEN CAST(completed_blocks AS REAL) / total_blocks ELSE 0 END)"
+}
+
+SUMMARY_FIELDS = ["course_id", "title", "overview", "total_weeks", "skills", "total_blocks", "completed_blocks"]
+
+# Mutations accepted by CourseStore.apply_mutations, mapped to their implementations
+MUTATIONS = {
+    "block_completed": "_apply_block_completed",
+    "blocks_completed": "_apply_blocks_completed",
+    "chat_turn": "_apply_chat_turn"
+}
+
+
+class CourseStore:
+    """
+    SQLite storage for generated courses.
+
+    Courses are normalized into courses/weeks/modules/blocks/milestones tables
+    so the studio endpoints can read or flip a single row instead of parsing and
+    rewriting the whole result.json. Tutor exchanges live in chat_turns.
+
+    Every content write bumps courses.version. Assembled documents are kept in
+    an LRU cache keyed by that version, so repeat reads skip SQL and JSON parsing.
+    """
+
+    def __init__(self, db_path: str = COURSE_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._epoch: Optional[str] = None
+        self.cache = CourseCache(COURSE_CACHE_SIZE)
+        self.index_cache = CourseCache(COURSE_CACHE_SIZE)
+        self.skeleton_cache = CourseCache(COURSE_CACHE_SIZE)
+        self.week_cache = CourseCache(COURSE_CACHE_SIZE)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._migrate(conn)
+                    conn.executescript(INDEXES)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        for table, column, definition, backfill in COLUMN_MIGRATIONS:
+            columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                if backfill:
+                    conn.execute(backfill)
+                logger.info(f"Added column {table}.{column} to course store")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def has_course(self, course_id: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM courses WHERE course_id = ?", (course_id,)
+        ).fetchone()
+        return row is not None
+
+    def _versions(self) -> Dict[Optional[str], int]:
+        """
+        Per-thread memo of course versions (and the catalog version under None).
+
+        The memo is dropped whenever SQLite reports a commit from another
+        connection (PRAGMA data_version), so repeat lookups do not query the
+        courses table.
+        """
+        conn = self._connect()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if getattr(self._local, "data_version", None) != data_version:
+            self._local.data_version = data_version
+            self._local.versions = {}
+        return self._local.versions
+
+    def _course_version(self, course_id: str) -> Optional[int]:
+        """
+        Current write version of a course, or None if it does not exist.
+
+        An archived course has a version too, but no content rows until it is
+        rehydrated (see ColdStorage.ensure_live).
+        """
+        conn = self._connect()
+        versions = self._versions()
+        if course_id not in versions:
+            row = conn.execute("SELECT version FROM courses WHERE course_id = ?", (course_id,)).fetchone()
+            if row is None:
+                return None
+            versions[course_id] = row["version"]
+        return versions[course_id]
+
+    def course_version(self, course_id: str) -> Optional[int]:
+        """Write version of a course for conditional requests, or None if it does not exist."""
+        return self._course_version(course_id)
+
+    def catalog_version(self) -> int:
+        """Counter bumped by every write that changes the course summary list."""
+        versions = self._versions()
+        if None not in versions:
+            row = self._connect().execute("SELECT value FROM store_meta WHERE key = 'catalog_version'").fetchone()
+            versions[None] = int(row["value"])
+        return versions[None]
+
+    @property
+    def epoch(self) -> str:
+        if self._epoch is None:
+            row = self._connect().execute("SELECT value FROM store_meta WHERE key = 'epoch'").fetchone()
+            self._epoch = row["value"]
+        return self._epoch
+
+    def _bump_catalog(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "UPDATE store_meta SET value = CAST(CAST(value AS INTEGER) + 1 AS TEXT) WHERE key = 'catalog_version'"
+        )
+
+    def _forget(self, course_id: str) -> None:
+        """Drop cached state for a course after this process wrote to it."""
+        versions = getattr(self._local, "versions", None)
+        if versions is not None:
+            versions.pop(course_id, None)
+            versions.pop(None, None)
+        self.cache.invalidate(course_id)
+        self.index_cache.invalidate(course_id)
+        self.skeleton_cache.invalidate(course_id)
+        self.week_cache.invalidate(course_id)
+
+    def save_course(self, course_id: str, course_data: Dict[str, Any], created_at: Optional[str] = None) -> None:
+        """
+        Insert or update a course from its result.json representation.
+
+        An existing course is updated in place: weeks, modules and blocks are
+        matched by their stable IDs, so a re-import keeps each block's chat
+        turns and completed flag; the file's values only apply to new blocks.
+        Rows whose IDs are no longer in the document are removed.
+
+        Args:
+            course_id: Identifier of the course (the responses/ folder name).
+            course_data: Dictionary with "course_outline" and optional "user_requirement".
+            created_at: ISO timestamp of creation, defaults to the existing one or now.
+        """
+        outline = course_data["course_outline"]
+        assign_ids(course_data)
+        now = datetime.utcnow().isoformat()
+        with self._transaction() as conn:
+            previous = conn.execute("SELECT version, created_at FROM courses WHERE course_id = ?", (course_id,)).fetchone()
+            conn.execute(
+                """
+                INSERT INTO courses (course_id, title, overview, total_weeks, prerequisites,
+                                     learning_outcomes, skills, user_requirement, version, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(course_id) DO UPDATE SET
+                    title = excluded.title, overview = excluded.overview, total_weeks = excluded.total_weeks,
+                    prerequisites = excluded.prerequisites, learning_outcomes = excluded.learning_outcomes,
+                    skills = excluded.skills, user_requirement = excluded.user_requirement,
+                    version = excluded.version, created_at = excluded.created_at,
+                    updated_at = excluded.updated_at, archived_at = NULL
+                """,
+                (
+                    course_id,
+                    outline.get("title", ""),
+                    outline.get("overview", ""),
+                    int(outline.get("total_weeks", 0) or 0),
+                    dumps_str(outline.get("prerequisites", [])),
+                    dumps_str(outline.get("learning_outcomes", [])),
+                    dumps_str(outline.get("skills", [])),
+                    dumps_str(course_data["user_requirement"]) if "user_requirement" in course_data else None,
+                    previous["version"] + 1 if previous else 1,
+                    created_at or (previous["created_at"] if previous else now),
+                    now
+                )
+            )
+
+            existing = {
+                table: {row["uid"]: row[key] for row in conn.execute(f"SELECT uid, {key} FROM {table} WHERE course_id = ?", (course_id,))}
+                for table, key in (("weeks", "week_id"), ("modules", "module_id"), ("blocks", "block_id"))
+            }
+            chatted = {row["block_id"] for row in conn.execute("SELECT DISTINCT block_id FROM chat_turns WHERE course_id = ?", (course_id,))}
+            kept = {"weeks": set(), "modules": set(), "blocks": set()}
+
+            # Milestones hold no user state; rebuilt below
+            conn.execute("DELETE FROM milestones WHERE course_id = ?", (course_id,))
+            for week_pos, week in enumerate(outline.get("weeks", [])):
+                week_values = (week_pos, week.get("week_number"), week.get("week_topic", ""), week.get("hours_per_week", 0))
+                week_id = existing["weeks"].get(week["id"])
+                if week_id is None:
+                    week_id = conn.execute(
+                        """
+                        INSERT INTO weeks (course_id, uid, position, week_number, week_topic, hours_per_week)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (course_id, week["id"], *week_values)
+                    ).lastrowid
+                else:
+                    conn.execute(
+                        "UPDATE weeks SET position = ?, week_number = ?, week_topic = ?, hours_per_week = ? WHERE week_id = ?",
+                        (*week_values, week_id)
+                    )
+                kept["weeks"].add(week_id)
+
+                for module_pos, module in enumerate(week.get("week_modules", [])):
+                    module_values = (week_id, module_pos, module.get("module_title", ""), module.get("duration_hours", 0))
+                    module_id = existing["modules"].get(module["id"])
+                    if module_id is None:
+                        module_id = conn.execute(
+                            """
+                            INSERT INTO modules (course_id, uid, week_id, position, module_title, duration_hours)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            """,
+                            (course_id, module["id"], *module_values)
+                        ).lastrowid
+                    else:
+                        conn.execute(
+                            "UPDATE modules SET week_id = ?, position = ?, module_title = ?, duration_hours = ? WHERE module_id = ?",
+                            (*module_values, module_id)
+                        )
+                    kept["modules"].add(module_id)
+
+                    for block_pos, block in enumerate(module.get("content_blocks", [])):
+                        block_values = (
+                            module_id, block_pos,
+                            block.get("block_title", ""),
+                            block.get("length", 0),
+                            block.get("type", ""),
+                            dumps_str(block.get("objectives", [])),
+                            dumps_str(block.get("references", []))
+                        )
+                        block_id = existing["blocks"].get(block["id"])
+                        if block_id is None:
+                            block_id = conn.execute(
+                                """
+                                INSERT INTO blocks (course_id, uid, module_id, position, block_title, length, type,
+                                                    objectives, "references", completed)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                """,
+                                (course_id, block["id"], *block_values, int(bool(block.get("completed", False))))
+                            ).lastrowid
+                        else:
+                            # Progress lives in the store: the file's completed flag may be stale
+                            conn.execute(
+                                """
+                                UPDATE blocks SET module_id = ?, position = ?, block_title = ?, length = ?, type = ?,
+                                                  objectives = ?, "references" = ?
+                                WHERE block_id = ?
+                                """,
+                                (*block_values, block_id)
+                            )
+                        kept["blocks"].add(block_id)
+                        if block_id not in chatted:
+                            # Legacy chat embedded in the file; a block with turns in the store already has it
+                            for pair in block.get("chat", []) or []:
+                                self._insert_chat_pair(conn, course_id, block_id, pair)
+
+                if "week_milestone" in week:
+                    self._insert_milestone(conn, course_id, week_id, week["week_milestone"])
+
+            if "course_milestone" in outline:
+                self._insert_milestone(conn, course_id, None, outline["course_milestone"])
+
+            for table, key in (("blocks", "block_id"), ("modules", "module_id"), ("weeks", "week_id")):
+                removed = [(row_id,) for row_id in existing[table].values() if row_id not in kept[table]]
+                conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", removed)
+
+            conn.execute(
+                """
+                UPDATE courses SET
+                    total_blocks = (SELECT COUNT(*) FROM blocks WHERE course_id = ?),
+                    completed_blocks = (SELECT COUNT(*) FROM blocks WHERE course_id = ? AND completed = 1)
+                WHERE course_id = ?
+                """,
+                (course_id, course_id, course_id)
+            )
+            self._bump_catalog(conn)
+
+        self._forget(course_id)
+        logger.info(f"Saved course {course_id} to course store")
+
+    def _insert_milestone(self, conn: sqlite3.Connection, course_id: str, week_id: Optional[int], milestone: Dict[str, Any]) -> None:
+        conn.execute(
+            """
+            INSERT INTO milestones (course_id, week_id, milestone_title, description, length, type,
+                                    objectives, prerequisites, deliverables, upload_required,
+                                    supported_filetypes, "references")
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                course_id, week_id,
+                *(milestone.get(field, "") for field in MILESTONE_TEXT_FIELDS),
+                *(dumps_str(milestone.get(field, [])) for field in MILESTONE_JSON_FIELDS)
+            )
+        )
+
+    def _insert_chat_pair(self, conn: sqlite3.Connection, course_id: str, block_id: int, pair: List[Dict[str, Any]]) -> None:
+        try:
+            user_msg, ai_msg = pair[0], pair[1]
+        except (IndexError, KeyError, TypeError):
+            logger.warning(f"Skipping malformed chat entry for block {block_id} in course {course_id}")
+            return
+        conn.execute(
+            """
+            INSERT INTO chat_turns (course_id, block_id, query, reply, model, response_time, start_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                course_id, block_id,
+                user_msg.get("message", ""),
+                ai_msg.get("message", ""),
+                ai_msg.get("model", user_msg.get("model")),
+                ai_msg.get("response_time", user_msg.get("response_time")),
+                user_msg.get("start_time")
+            )
+        )
+
+    def _milestone_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        milestone = {field: row[field] for field in MILESTONE_TEXT_FIELDS}
+        milestone.update({field: loads(row[field]) for field in MILESTONE_JSON_FIELDS})
+        return milestone
+
+    def load_course(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild a course in the result.json layout, served from the cache when current.
+
+        Args:
+            course_id: Identifier of the course.
+
+        Returns:
+            The course dictionary (shared, do not mutate), or None if the course does not exist.
+        """
+        version = self._course_version(course_id)
+        if version is None:
+            return None
+        course_data = self.cache.get(course_id, version)
+        if course_data is None:
+            course_data = self._read_course(course_id)
+            if course_data is not None:
+                self.cache.put(course_id, version, course_data)
+        return course_data
+
+    def _read_weeks(self, conn: sqlite3.Connection, course_id: str, week_id: Optional[int] = None, full: bool = True) -> List[Dict[str, Any]]:
+        """
+        Assemble weeks in the result.json layout.
+
+        Args:
+            conn: Connection to read from.
+            course_id: Identifier of the course.
+            week_id: Row id of a single week to read; all weeks if None.
+            full: Include block objectives/references and full milestones. The
+                skeleton (full=False) carries only titles, lengths and flags.
+        """
+        if week_id is None:
+            scope, params = "course_id = ?", (course_id,)
+            block_scope = "course_id = ?"
+        else:
+            scope, params = "course_id = ? AND week_id = ?", (course_id, week_id)
+            block_scope = "module_id IN (SELECT module_id FROM modules WHERE course_id = ? AND week_id = ?)"
+        block_columns = "*" if full else "module_id, uid, block_title, length, type, completed"
+
+        milestones = {}
+        for row in conn.execute(f"SELECT * FROM milestones WHERE {scope} AND week_id IS NOT NULL", params):
+            milestones[row["week_id"]] = self._milestone_dict(row) if full else {
+                "milestone_title": row["milestone_title"],
+                "length": row["length"]
+            }
+
+        blocks_by_module: Dict[int, List[Dict[str, Any]]] = {}
+        for row in conn.execute(
+            f"SELECT {block_columns} FROM blocks WHERE {block_scope} ORDER BY module_id, position", params
+        ):
+            block = {
+                "id": row["uid"],
+                "block_title": row["block_title"],
+                "length": row["length"],
+                "type": row["type"]
+            }
+            if full:
+                block["objectives"] = loads(row["objectives"])
+                block["references"] = loads(row["references"])
+            block["completed"] = bool(row["completed"])
+            blocks_by_module.setdefault(row["module_id"], []).append(block)
+
+        modules_by_week: Dict[int, List[Dict[str, Any]]] = {}
+        for row in conn.execute(
+            f"SELECT * FROM modules WHERE {scope} ORDER BY week_id, position", params
+        ):
+            modules_by_week.setdefault(row["week_id"], []).append({
+                "id": row["uid"],
+                "module_title": row["module_title"],
+                "duration_hours": row["duration_hours"],
+                "content_blocks": blocks_by_module.get(row["module_id"], [])
+            })
+
+        weeks = []
+        for row in conn.execute(f"SELECT * FROM weeks WHERE {scope} ORDER BY position", params):
+            week = {
+                "id": row["uid"],
+                "week_number": row["week_number"],
+                "week_topic": row["week_topic"],
+                "week_modules": modules_by_week.get(row["week_id"], []),
+                "hours_per_week": row["hours_per_week"]
+            }
+            if row["week_id"] in milestones:
+                week["week_milestone"] = milestones[row["week_id"]]
+            weeks.append(week)
+        return weeks
+
+    def _read_course(self, course_id: str, lazy_weeks: bool = False) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        course = conn.execute("SELECT * FROM courses WHERE course_id = ?", (course_id,)).fetchone()
+        if course is None:
+            return None
+        if lazy_weeks:
+            week_ids = [row["week_id"] for row in conn.execute(
+                "SELECT week_id FROM weeks WHERE course_id = ? ORDER BY position", (course_id,)
+            )]
+            weeks = self._iter_weeks(course_id, week_ids)
+        else:
+            weeks = self._read_weeks(conn, course_id)
+
+        course_milestone = conn.execute(
+            "SELECT * FROM milestones WHERE course_id = ? AND week_id IS NULL", (course_id,)
+        ).fetchone()
+        course_data: Dict[str, Any] = {
+            "course_outline": {
+                "title": course["title"],
+                "overview": course["overview"],
+                "prerequisites": loads(course["prerequisites"]),
+                "total_weeks": course["total_weeks"],
+                "learning_outcomes": loads(course["learning_outcomes"]),
+                "skills": loads(course["skills"]),
+                "weeks": weeks,
+                "course_milestone": self._milestone_dict(course_milestone) if course_milestone else {}
+            }
+        }
+        if course["user_requirement"] is not None:
+            course_data["user_requirement"] = loads(course["user_requirement"])
+        return course_data
+
+    def _iter_weeks(self, course_id: str, week_ids: List[int]) -> Iterator[Dict[str, Any]]:
+        for week_id in week_ids:
+            # Resolve the connection per week: a streaming response may resume on another thread
+            weeks = self._read_weeks(self._connect(), course_id, week_id=week_id)
+            if weeks:
+                yield weeks[0]
+
+    def stream_course(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A course in the result.json layout whose weeks are read one at a time.
+
+        For exports of very large courses: only one week is in memory at a
+        time and nothing is added to the caches. A cached full course is
+        returned as is. A week removed while the weeks are being consumed is
+        skipped.
+
+        Args:
+            course_id: Identifier of the course.
+
+        Returns:
+            The course dictionary with "weeks" as an iterator, or None if the course does not exist.
+        """
+        version = self._course_version(course_id)
+        if version is None:
+            return None
+        course_data = self.cache.get(course_id, version)
+        if course_data is not None:
+            return course_data
+        return self._read_course(course_id, lazy_weeks=True)
+
+    def load_course_skeleton(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Course structure without block objectives/references or milestone details.
+
+        This is what the studio's course view renders; it skips the JSON columns
+        that dominate a course's size. Cached per course version like load_course.
+
+        Returns:
+            The skeleton in the result.json layout (shared, do not mutate), or None if the course does not exist.
+        """
+        version = self._course_version(course_id)
+        if version is None:
+            return None
+        skeleton = self.skeleton_cache.get(course_id, version)
+        if skeleton is not None:
+            return skeleton
+
+        conn = self._connect()
+        course = conn.execute(
+            "SELECT title, overview, total_weeks FROM courses WHERE course_id = ?", (course_id,)
+        ).fetchone()
+        if course is None:
+            return None
+        course_milestone = conn.execute(
+            "SELECT milestone_title, length FROM milestones WHERE course_id = ? AND week_id IS NULL", (course_id,)
+        ).fetchone()
+        skeleton = {
+            "course_outline": {
+                "title": course["title"],
+                "overview": course["overview"],
+                "total_weeks": course["total_weeks"],
+                "weeks": self._read_weeks(conn, course_id, full=False),
+                "course_milestone": dict(course_milestone) if course_milestone else {}
+            }
+        }
+        self.skeleton_cache.put(course_id, version, skeleton)
+        return skeleton
+
+    def load_week(self, course_id: str, week_uid: str) -> Optional[Dict[str, Any]]:
+        """
+        Full payload of one week (objectives, references, milestone).
+
+        Weeks are cached individually per course version, so opening a week
+        reads only that week's rows.
+
+        Returns:
+            The week (shared, do not mutate), or None if the course or week does not exist.
+        """
+        version = self._course_version(course_id)
+        if version is None:
+            return None
+        weeks = self.week_cache.get(course_id, version)
+        if weeks is None:
+            weeks = {}
+            self.week_cache.put(course_id, version, weeks)
+        if week_uid in weeks:
+            return weeks[week_uid]
+
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT week_id FROM weeks WHERE course_id = ? AND uid = ?", (course_id, week_uid)
+        ).fetchone()
+        if row is None:
+            return None
+        week = self._read_weeks(conn, course_id, week_id=row["week_id"])[0]
+        weeks[week_uid] = week
+        return week
+
+    def load_scope(self, course_id: str, week_uid: Optional[str] = None, module_uid: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Resolve the week (and optionally module) an export is limited to.
+
+        A module may be given without its week; the week is then looked up in
+        the course skeleton.
+
+        Returns:
+            Dict with the course title, the full week and the module (or None).
+
+        Raises:
+            LookupError: If the course, week or module does not exist.
+        """
+        skeleton = self.load_course_skeleton(course_id)
+        if skeleton is None:
+            raise LookupError(f"Course '{course_id}' not found.")
+        if week_uid is None:
+            week_uid = next((
+                week["id"] for week in skeleton["course_outline"]["weeks"]
+                if any(module["id"] == module_uid for module in week["week_modules"])
+            ), None)
+            if week_uid is None:
+                raise LookupError(f"Module '{module_uid}' not found.")
+
+        week = self.load_week(course_id, week_uid)
+        if week is None:
+            raise LookupError(f"Week '{week_uid}' not found.")
+        module = None
+        if module_uid is not None:
+            module = next((module for module in week["week_modules"] if module["id"] == module_uid), None)
+            if module is None:
+                raise LookupError(f"Module '{module_uid}' not found in week '{week_uid}'.")
+        return {"title": skeleton["course_outline"]["title"], "week": week, "module": module}
+
+    def list_course_summaries(self) -> List[Dict[str, Any]]:
+        """Return the summary of every course, oldest first."""
+        return self.page_course_summaries()[0]
+
+    def page_course_summaries(
+        self,
+        sort: str = "created",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, str]] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, str]]]:
+        """
+        Return one page of course summaries with keyset pagination.
+
+        The counts are kept on the courses row by save_course and the block
+        mutations, so this never touches the blocks table. Pages are read by
+        seeking the (sort key, course_id) index past the previous page's last
+        row, so the cost of a page does not grow with the number of courses.
+
+        Args:
+            sort: One of SUMMARY_SORT_KEYS.
+            descending: Reverse the sort order.
+            limit: Page size; all courses if None.
+            after: (sort value, course_id) of the last row of the previous page.
+            fields: Subset of SUMMARY_FIELDS to return; all if None.
+
+        Returns:
+            The rows and the key to pass as `after` for the next page (None on the last page).
+        """
+        key = SUMMARY_SORT_KEYS[sort]
+        columns = SUMMARY_FIELDS if fields is None else [field for field in SUMMARY_FIELDS if field in fields]
+        direction = "DESC" if descending else "ASC"
+        query = f"SELECT {', '.join(columns) or 'course_id'}, course_id AS page_id, {key} AS page_key FROM courses"
+        params: list = []
+        if after is not None:
+            # Spelled out rather than as a row value so SQLite can seek the expression index too
+            op = "<" if descending else ">"
+            query += f" WHERE {key} {op}= ? AND ({key} {op} ? OR course_id {op} ?)"
+            params.extend([after[0], after[0], after[1]])
+        query += f" ORDER BY {key} {direction}, course_id {direction}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+
+        rows = self._connect().execute(query, params).fetchall()
+        next_key = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1]["page_key"], rows[-1]["page_id"])
+        summaries = []
+        for row in rows:
+            summary = {column: row[column] for column in columns}
+            if "skills" in summary:
+                summary["skills"] = loads(summary["skills"])
+            summaries.append(summary)
+        return summaries, next_key
+
+    def list_cold_courses(self, updated_before: str) -> List[Dict[str, Any]]:
+        """
+        Return live courses whose last write is older than `updated_before`.
+
+        Args:
+            updated_before: ISO timestamp cutoff.
+
+        Returns:
+            course_id and created_at of each candidate for the cold tier.
+        """
+        rows = self._connect().execute(
+            """
+            SELECT course_id, created_at FROM courses
+            WHERE updated_at < ? AND archived_at IS NULL
+            ORDER BY updated_at
+            """,
+            (updated_before,)
+        ).fetchall()
+        return [{"course_id": row["course_id"], "created_at": row["created_at"]} for row in rows]
+
+    def find_course_ids(
+        self,
+        title_contains: Optional[str] = None,
+        updated_after: Optional[str] = None,
+        updated_before: Optional[str] = None
+    ) -> List[str]:
+        """
+        IDs of the courses matching a filter, oldest first. Archived courses are included.
+
+        Args:
+            title_contains: Case-insensitive substring of the title.
+            updated_after: ISO timestamp; only courses written after it.
+            updated_before: ISO timestamp; only courses last written before it.
+        """
+        conditions, params = [], []
+        if title_contains:
+            conditions.append("instr(lower(title), lower(?)) > 0")
+            params.append(title_contains)
+        if updated_after:
+            conditions.append("updated_at > ?")
+            params.append(updated_after)
+        if updated_before:
+            conditions.append("updated_at < ?")
+            params.append(updated_before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connect().execute(
+            f"SELECT course_id FROM courses {where} ORDER BY created_at, course_id", params
+        ).fetchall()
+        return [row["course_id"] for row in rows]
+
+    def is_archived(self, course_id: str) -> bool:
+        row = self._connect().execute(
+            "SELECT archived_at FROM courses WHERE course_id = ?", (course_id,)
+        ).fetchone()
+        return row is not None and row["archived_at"] is not None
+
+    def course_updated_at(self, course_id: str) -> Optional[str]:
+        """Time of a course's last write or tutor turn, or None if it does not exist."""
+        row = self._connect().execute(
+            "SELECT updated_at FROM courses WHERE course_id = ?", (course_id,)
+        ).fetchone()
+        return row["updated_at"] if row else None
+
+    def archive_course_rows(self, course_id: str, updated_at: Optional[str] = None) -> bool:
+        """
+        Drop a course's content and chat rows, keeping only its courses row.
+
+        The summary list keeps working from the courses row; the content is
+        restored with save_course when the course is rehydrated.
+
+        Args:
+            course_id: Course to archive.
+            updated_at: The course's updated_at when its snapshot was taken;
+                nothing is dropped if a write or tutor turn has landed since.
+
+        Returns:
+            Whether the rows were dropped.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT updated_at, archived_at FROM courses WHERE course_id = ?", (course_id,)
+            ).fetchone()
+            if row is None or row["archived_at"] is not None:
+                return False
+            if updated_at is not None and row["updated_at"] != updated_at:
+                return False
+            conn.execute("DELETE FROM chat_turns WHERE course_id = ?", (course_id,))
+            conn.execute("DELETE FROM milestones WHERE course_id = ?", (course_id,))
+            conn.execute("DELETE FROM blocks WHERE course_id = ?", (course_id,))
+            conn.execute("DELETE FROM modules WHERE course_id = ?", (course_id,))
+            conn.execute("DELETE FROM weeks WHERE course_id = ?", (course_id,))
+            conn.execute(
+                "UPDATE courses SET archived_at = ?, version = version + 1 WHERE course_id = ?",
+                (datetime.utcnow().isoformat(), course_id)
+            )
+        self._forget(course_id)
+        return True
+
+    def get_course_title(self, course_id: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT title FROM courses WHERE course_id = ?", (course_id,)
+        ).fetchone()
+        return row["title"] if row else None
+
+    def _block_index(self, course_id: str) -> Optional[Dict[str, Dict]]:
+        """
+        Per-course lookup tables from stable IDs and legacy titles to block rows.
+
+        Built with one query and cached per course version, so resolving a block
+        is a dictionary lookup instead of a scan over weeks, modules and blocks.
+        """
+        version = self._course_version(course_id)
+        if version is None:
+            return None
+        index = self.index_cache.get(course_id, version)
+        if index is not None:
+            return index
+
+        index = {"rows": {}, "weeks": {}, "modules": {}, "blocks": {}}
+        rows = self._connect().execute(
+            """
+            SELECT b.block_id, b.uid, b.block_title, m.module_title, w.week_topic
+            FROM blocks b
+            JOIN modules m ON m.module_id = b.module_id
+            JOIN weeks w ON w.week_id = m.week_id
+            WHERE b.course_id = ?
+            ORDER BY w.position, m.position, b.position
+            """,
+            (course_id,)
+        )
+        for row in rows:
+            index["rows"][row["uid"]] = {
+                "block_id": row["block_id"],
+                "week_topic": row["week_topic"],
+                "module_title": row["module_title"],
+                "block_title": row["block_title"]
+            }
+            # First match wins for repeated titles, like the old linear scans
+            index["weeks"].setdefault(row["week_topic"], True)
+            index["modules"].setdefault((row["week_topic"], row["module_title"]), True)
+            index["blocks"].setdefault((row["week_topic"], row["module_title"], row["block_title"]), row["uid"])
+        self.index_cache.put(course_id, version, index)
+        return index
+
+    def block_ids(self, course_id: str) -> Dict[str, int]:
+        """Map each block's stable ID to its row id."""
+        index = self._block_index(course_id)
+        if index is None:
+            raise LookupError(f"Course '{course_id}' not found.")
+        return {uid: row["block_id"] for uid, row in index["rows"].items()}
+
+    def find_block(
+        self,
+        course_id: str,
+        week_name: Optional[str] = None,
+        module_name: Optional[str] = None,
+        block_name: Optional[str] = None,
+        block_uid: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Locate a block by its stable ID, or by week topic, module title and block title.
+
+        Returns:
+            Dict with block_id (row id), id (stable ID), the week/module/block titles,
+            objectives and completed.
+
+        Raises:
+            LookupError: If the course, week, module or block does not exist.
+        """
+        index = self._block_index(course_id)
+        if index is None:
+            raise LookupError(f"Course '{course_id}' not found.")
+        if block_uid is None:
+            if week_name not in index["weeks"]:
+                raise LookupError(f"Week '{week_name}' not found.")
+            if (week_name, module_name) not in index["modules"]:
+                raise LookupError(f"Module '{module_name}' not found.")
+            block_uid = index["blocks"].get((week_name, module_name, block_name))
+            if block_uid is None:
+                raise LookupError(f"Block '{block_name}' not found.")
+        elif block_uid not in index["rows"]:
+            raise LookupError(f"Block '{block_uid}' not found.")
+
+        location = index["rows"][block_uid]
+        block = self._connect().execute(
+            "SELECT objectives, completed FROM blocks WHERE block_id = ?", (location["block_id"],)
+        ).fetchone()
+        return {
+            **location,
+            "id": block_uid,
+            "objectives": loads(block["objectives"]),
+            "completed": bool(block["completed"])
+        }
+
+    def _apply_block_completed(self, conn: sqlite3.Connection, course_id: str, block_id: int, completed: bool) -> Tuple[bool, bool]:
+        changed = conn.execute(
+            "UPDATE blocks SET completed = ? WHERE block_id = ? AND course_id = ? AND completed != ?",
+            (int(completed), block_id, course_id, int(completed))
+        ).rowcount
+        if changed:
+            conn.execute(
+                "UPDATE courses SET completed_blocks = completed_blocks + ? WHERE course_id = ?",
+                (1 if completed else -1, course_id)
+            )
+        return bool(changed), bool(changed)
+
+    def _apply_blocks_completed(self, conn: sqlite3.Connection, course_id: str, updates: List[Tuple[int, bool]]) -> Tuple[bool, Dict[str, int]]:
+        changed = 0
+        for block_id, completed in updates:
+            changed += self._apply_block_completed(conn, course_id, block_id, completed)[0]
+        counts = conn.execute(
+            "SELECT total_blocks, completed_blocks FROM courses WHERE course_id = ?", (course_id,)
+        ).fetchone()
+        if counts is None:
+            raise LookupError(f"Course '{course_id}' not found.")
+        return changed > 0, {
+            "updated": changed,
+            "total_blocks": counts["total_blocks"],
+            "completed_blocks": counts["completed_blocks"]
+        }
+
+    def _apply_chat_turn(self, conn: sqlite3.Connection, course_id: str, block_id: int, pair: List[Dict[str, Any]]) -> Tuple[bool, None]:
+        self._insert_chat_pair(conn, course_id, block_id, pair)
+        # Tutor activity counts as use of the course for cold storage
+        conn.execute(
+            "UPDATE courses SET updated_at = ? WHERE course_id = ?",
+            (datetime.utcnow().isoformat(), course_id)
+        )
+        # Chat is not part of the assembled course document, so cached copies stay valid
+        return False, None
+
+    def apply_mutations(self, course_id: str, mutations: List[Tuple[str, tuple]]) -> List[Tuple[bool, Any]]:
+        """
+        Apply several mutations of one course in a single transaction.
+
+        Each mutation runs under its own savepoint, so a failing one is rolled
+        back and reported without discarding the others. The course version is
+        bumped once if any mutation changed the course document.
+
+        Args:
+            course_id: Identifier of the course.
+            mutations: (operation, args) pairs; operation is one of MUTATIONS.
+                Implementations return (content_changed, result).
+
+        Returns:
+            One (ok, result-or-exception) pair per mutation, in order.
+        """
+        results: List[Tuple[bool, Any]] = []
+        content_changed = False
+        with self._transaction() as conn:
+            for operation, args in mutations:
+                conn.execute("SAVEPOINT mutation")
+                try:
+                    changed, result = getattr(self, MUTATIONS[operation])(conn, course_id, *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO mutation")
+                    conn.execute("RELEASE mutation")
+                    results.append((False, e))
+                    continue
+                conn.execute("RELEASE mutation")
+                content_changed = content_changed or changed
+                results.append((True, result))
+            if content_changed:
+                conn.execute(
+                    "UPDATE courses SET version = version + 1, updated_at = ? WHERE course_id = ?",
+                    (datetime.utcnow().isoformat(), course_id)
+                )
+                self._bump_catalog(conn)
+        if content_changed:
+            self._forget(course_id)
+        return results
+
+    def _apply_one(self, course_id: str, operation: str, *args: Any) -> Any:
+        ok, result = self.apply_mutations(course_id, [(operation, args)])[0]
+        if not ok:
+            raise result
+        return result
+
+    def set_block_completed(self, course_id: str, block_id: int, completed: bool) -> bool:
+        """
+        Set a block's completion flag and keep the course's completed_blocks in step.
+
+        Returns:
+            True if the flag changed.
+        """
+        return self._apply_one(course_id, "block_completed", block_id, completed)
+
+    def set_blocks_completed(self, course_id: str, updates: List[Tuple[int, bool]]) -> Dict[str, int]:
+        """
+        Set the completion flag of several blocks atomically.
+
+        Args:
+            course_id: Identifier of the course.
+            updates: (block_id, completed) pairs.
+
+        Returns:
+            Number of blocks that changed plus the course's new total/completed block counts.
+        """
+        return self._apply_one(course_id, "blocks_completed", updates)
+
+    def get_chat_history(self, block_id: int, limit: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Return tutor exchanges for a block as [user, AI] message pairs, oldest first.
+
+        Only the requested tail is read: rows are walked backwards on the
+        (block_id, turn_id) index and the scan stops after `limit` exchanges.
+
+        Args:
+            block_id: Identifier of the block.
+            limit: If given, only the most recent `limit` exchanges are returned.
+        """
+        query = "SELECT * FROM chat_turns WHERE block_id = ? ORDER BY turn_id DESC"
+        params: tuple = (block_id,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (block_id, limit)
+        rows = self._connect().execute(query, params).fetchall()
+        return [
+            [
+                {
+                    "role": "user",
+                    "message": row["query"],
+                    "model": row["model"],
+                    "response_time": row["response_time"],
+                    "start_time": row["start_time"]
+                },
+                {
+                    "role": "AI",
+                    "message": row["reply"],
+                    "model": row["model"],
+                    "response_time": row["response_time"],
+                    "start_time": row["start_time"]
+                }
+            ]
+            for row in reversed(rows)
+        ]
+
+    def append_chat_turn(self, course_id: str, block_id: int, pair: List[Dict[str, Any]]) -> None:
+        self._apply_one(course_id, "chat_turn", block_id, pair)
+
+    @contextmanager
+    def _import_lock(self, responses_dir: str) -> Iterator[None]:
+        # Every uvicorn worker imports at startup and watches responses/; the lock keeps them from importing the same course twice
+        with open(os.path.join(responses_dir, ".import.lock"), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _import_file(self, course_id: str, result_path: str, strip_chat: bool = False) -> bool:
+        try:
+            course_data = load_file(result_path)
+            if "course_outline" not in course_data:
+                logger.info(f"Skipping {result_path}: no course_outline")
+                return False
+            created_at = None
+            if not self.has_course(course_id):
+                created_at = datetime.utcfromtimestamp(os.path.getmtime(result_path)).isoformat()
+            self.save_course(course_id, course_data, created_at=created_at)
+            if strip_chat and strip_block_chat(course_data):
+                tmp_path = f"{result_path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(dumps(course_data, indent=ARTIFACT_INDENT))
+                os.replace(tmp_path, result_path)
+                logger.info(f"Moved embedded chat out of {result_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to import {result_path}: {str(e)}")
+            return False
+
+    def import_responses(self, responses_dir: str = RESPONSES_DIR, strip_chat: bool = False) -> int:
+        """
+        One-shot import of responses/<course_id>/result.json files not yet in the store.
+
+        Args:
+            responses_dir: Directory holding one folder per course.
+            strip_chat: Rewrite imported result.json files without the embedded
+                block chat, which now lives in chat_turns.
+
+        Returns:
+            Number of courses imported.
+        """
+        imported = 0
+        if not os.path.isdir(responses_dir):
+            logger.warning(f"Responses directory {responses_dir} not found, nothing to import")
+            return imported
+
+        with self._import_lock(responses_dir):
+            for course_id in sorted(os.listdir(responses_dir)):
+                result_path = os.path.join(responses_dir, course_id, "result.json")
+                if not os.path.isfile(result_path) or self.has_course(course_id):
+                    continue
+                imported += self._import_file(course_id, result_path, strip_chat=strip_chat)
+
+        logger.info(f"Imported {imported} courses from {responses_dir}")
+        return imported
+
+    def import_course(self, course_id: str, responses_dir: str = RESPONSES_DIR) -> bool:
+        """
+        Import or refresh one course after its result.json appeared or changed.
+
+        A course already in the store is only refreshed when the file is newer
+        than the course's last write, i.e. it was put there from outside the
+        app (a restored backup or a hand edit). The refresh updates the course
+        in place, keeping its chat and block progress. Files the app itself
+        writes are older than the save_course that follows them, and archived
+        courses are left to the cold tier.
+
+        Returns:
+            True if the store was updated.
+        """
+        result_path = os.path.join(responses_dir, course_id, "result.json")
+        with self._import_lock(responses_dir):
+            if not os.path.isfile(result_path):
+                return False
+            row = self._connect().execute(
+                "SELECT updated_at, archived_at FROM courses WHERE course_id = ?", (course_id,)
+            ).fetchone()
+            if row is not None:
+                modified_at = datetime.utcfromtimestamp(os.path.getmtime(result_path)).isoformat()
+                if row["archived_at"] is not None or modified_at <= row["updated_at"]:
+                    return False
+            return self._import_file(course_id, result_path)
+
+
+def strip_block_chat(course_data: Dict[str, Any]) -> bool:
+    """Remove embedded block chat from a result.json document. Returns True if any was found."""
+    stripped = False
+    for week in course_data["course_outline"].get("weeks", []):
+        for module in week.get("week_modules", []):
+            for block in module.get("content_blocks", []):
+                if block.pop("chat", None) is not None:
+                    stripped = True
+    return stripped
+
+
+course_store = CourseStore()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import responses/ into the course store")
+    parser.add_argument("--responses-dir", default=RESPONSES_DIR)
+    parser.add_argument("--strip-chat", action="store_true", help="remove embedded chat from imported result.json files")
+    args = parser.parse_args()
+    course_store.import_responses(args.responses_dir, strip_chat=args.strip_chat)
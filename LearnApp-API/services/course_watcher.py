@@ -0,0 +1,172 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+from config.config import RESPONSES_DIR, WATCH_POLL_INTERVAL
+from services.course_store import CourseStore, course_store
+from services.progress_log import ProgressLog, progress_log
+from utils.serializer import load_file
+
+try:
+    from watchfiles import awatch
+except ImportError:  # Optional: fall back to polling the responses directory
+    awatch = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+WATCHED_FILES = ("result.json", "progress.json")
+
+
+class CourseWatcher:
+    """
+    Keeps the course store in step with files landing in responses/.
+
+    Started from the FastAPI lifespan. It first imports responses/ in the
+    background, so startup does not wait on the scan. Afterwards each
+    result.json that appears or changes is imported into the store; the store
+    bumps the course version, which invalidates every cached document, index
+    and ETag for it. A progress.json other than the one this process just
+    wrote (e.g. from a restored backup) is replayed into the log; the replay
+    records its map as a whole, which is idempotent.
+
+    Uses inotify through watchfiles when installed, otherwise polls mtimes.
+    """
+
+    def __init__(
+        self,
+        store: CourseStore,
+        progress: ProgressLog,
+        responses_dir: str = RESPONSES_DIR,
+        poll_interval: float = WATCH_POLL_INTERVAL
+    ):
+        self.store = store
+        self.progress = progress
+        self.responses_dir = responses_dir
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._stats = {
+            "mode": "inotify" if awatch is not None else "polling",
+            "initial_import_ms": None,
+            "events": 0,
+            "courses_imported": 0,
+            "progress_replayed": 0
+        }
+
+    def start(self) -> None:
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _initial_import(self) -> None:
+        start = time.perf_counter()
+        await asyncio.to_thread(self.store.import_responses, self.responses_dir)
+        self._stats["initial_import_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def _run(self) -> None:
+        os.makedirs(self.responses_dir, exist_ok=True)
+        try:
+            if awatch is not None:
+                await self._watch_inotify()
+            else:
+                await self._watch_polling()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Course watcher stopped: {str(e)}")
+
+    async def _watch_inotify(self) -> None:
+        imported = False
+        # awatch registers the watch in a background thread; its first yield (a
+        # timeout at the latest) means the watch is live, so the initial import
+        # run then cannot miss a course that lands in between
+        async for changes in awatch(self.responses_dir, stop_event=self._stop, rust_timeout=1000, yield_on_timeout=True):
+            if not imported:
+                await self._initial_import()
+                imported = True
+            if changes:
+                await self._handle({path for _, path in changes})
+
+    async def _watch_polling(self) -> None:
+        # Baseline first, so files landing during the initial import show up as changes
+        seen = await asyncio.to_thread(self._scan)
+        await self._initial_import()
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            current = await asyncio.to_thread(self._scan)
+            changed = {path for path, mtime in current.items() if seen.get(path) != mtime}
+            seen = current
+            if changed:
+                await self._handle(changed)
+
+    def _scan(self) -> Dict[str, float]:
+        mtimes = {}
+        with os.scandir(self.responses_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                for name in WATCHED_FILES:
+                    path = os.path.join(entry.path, name)
+                    try:
+                        mtimes[path] = os.stat(path).st_mtime
+                    except FileNotFoundError:
+                        continue
+        return mtimes
+
+    def _course_file(self, path: str) -> Optional[Tuple[str, str]]:
+        """(course_id, file name) for a watched file directly under a course folder."""
+        relative = os.path.relpath(path, self.responses_dir)
+        parts = relative.split(os.sep)
+        if len(parts) != 2 or parts[1] not in WATCHED_FILES:
+            return None
+        return parts[0], parts[1]
+
+    async def _handle(self, paths: Set[str]) -> None:
+        for path in sorted(paths):
+            course_file = self._course_file(path)
+            if course_file is None or not os.path.isfile(path):
+                continue
+            self._stats["events"] += 1
+            course_id, name = course_file
+            try:
+                if name == "result.json":
+                    if await asyncio.to_thread(self.store.import_course, course_id, self.responses_dir):
+                        self._stats["courses_imported"] += 1
+                        logger.info(f"Watcher imported course {course_id}")
+                elif await asyncio.to_thread(self._replay_progress, course_id, path):
+                    self._stats["progress_replayed"] += 1
+            except Exception as e:
+                logger.error(f"Watcher failed to process {path}: {str(e)}")
+
+    def _replay_progress(self, course_id: str, path: str) -> bool:
+        progress_map = load_file(path)
+        # Our own write at the end of a generation: the log already has it
+        if self.progress.recorded(course_id) == progress_map:
+            return False
+        self.progress.record(course_id, progress_map)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "running": self._task is not None and not self._task.done()}
+
+
+course_watcher = CourseWatcher(course_store, progress_log)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from services.course_store import CourseStore, course_store
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+class CourseWriter:
+    """
+    Single writer per course for studio mutations.
+
+    Mutations of one course are serialized behind an asyncio lock. While a
+    write is in flight, further mutations of that course queue up and are
+    applied together in one store transaction by the next holder of the lock.
+    The SQLite work, including whole-course saves from the generation
+    routes, runs in a thread pool so the event loop keeps serving websocket
+    progress and tutor chat. SQLite's own locking (BEGIN IMMEDIATE)
+    serializes writers across uvicorn workers.
+    """
+
+    def __init__(self, store: CourseStore, max_workers: int = 2):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="course-writer")
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._queues: Dict[str, List[Tuple[str, tuple, asyncio.Future]]] = {}
+        self._stats = {
+            "mutations": 0,
+            "batches": 0,
+            "failures": 0,
+            "max_batch": 0
+        }
+
+    async def submit(self, course_id: str, operation: str, *args: Any) -> Any:
+        """
+        Queue a mutation for a course and wait until it has been committed.
+
+        Args:
+            course_id: Identifier of the course.
+            operation: Name of a store mutation (see course_store.MUTATIONS).
+            *args: Arguments of the mutation.
+
+        Returns:
+            The mutation's result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queues.setdefault(course_id, []).append((operation, args, future))
+        lock = self._locks.setdefault(course_id, asyncio.Lock())
+        try:
+            async with lock:
+                batch = self._queues.pop(course_id, [])
+                if batch:
+                    await self._apply(loop, course_id, batch)
+        finally:
+            if course_id not in self._queues and not lock.locked():
+                self._locks.pop(course_id, None)
+        return await future
+
+    async def _apply(self, loop: asyncio.AbstractEventLoop, course_id: str, batch: List[Tuple[str, tuple, asyncio.Future]]) -> None:
+        mutations = [(operation, args) for operation, args, _ in batch]
+        work = loop.run_in_executor(self._executor, self.store.apply_mutations, course_id, mutations)
+        try:
+            await asyncio.shield(work)
+        except asyncio.CancelledError:
+            # The caller holding the lock went away; the write still runs and answers the rest of the batch
+            work.add_done_callback(lambda done: self._settle(course_id, batch, done))
+            raise
+        except Exception:
+            pass
+        self._settle(course_id, batch, work)
+
+    def _settle(self, course_id: str, batch: List[Tuple[str, tuple, asyncio.Future]], work: asyncio.Future) -> None:
+        error = work.exception() if not work.cancelled() else asyncio.CancelledError()
+        if error is not None:
+            logger.error(f"Failed to apply {len(batch)} mutations to course {course_id}: {str(error)}")
+            self._stats["failures"] += len(batch)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self._stats["batches"] += 1
+        self._stats["mutations"] += len(batch)
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+        for (_, _, future), (ok, result) in zip(batch, work.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                self._stats["failures"] += 1
+                future.set_exception(result)
+
+    async def save_course(self, course_id: str, course_data: Dict[str, Any], created_at: Optional[str] = None) -> None:
+        """
+        Insert or update a whole course (see CourseStore.save_course) off the event loop.
+
+        Runs under the course's lock, so it does not interleave with queued
+        studio mutations of the same course.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._locks.setdefault(course_id, asyncio.Lock())
+        try:
+            async with lock:
+                await loop.run_in_executor(self._executor, self.store.save_course, course_id, course_data, created_at)
+        finally:
+            if course_id not in self._queues and not lock.locked():
+                self._locks.pop(course_id, None)
+
+    async def set_block_completed(self, course_id: str, block_id: int, completed: bool) -> bool:
+        return await self.submit(course_id, "block_completed", block_id, completed)
+
+    async def set_blocks_completed(self, course_id: str, updates: List[Tuple[int, bool]]) -> Dict[str, int]:
+        return await self.submit(course_id, "blocks_completed", updates)
+
+    async def append_chat_turn(self, course_id: str, block_id: int, pair: List[Dict[str, Any]]) -> None:
+        await self.submit(course_id, "chat_turn", block_id, pair)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queued_courses": len(self._queues)
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+course_writer = CourseWriter(course_store)
@@ -1,59 +1,70 @@
-import threading
-from typing import Any, Dict, List
-from google import genai
-from utils.genai import initialize_client, create_cache, delete_cache, generate_content, logger, courseoutline_md, format_weekly_plan, generate_overall_plan
-from prompts.online.course_outliner import COURSE_OUTLINE_SYSTEM, COURSE_OUTLINE_FORMAT
-from prompts.online.week_generator import WEEK_SYSTEM, WEEK_FORMAT
-from prompts.online.course_milestone import MILESTONE_SYSTEM, MILESTONE_FORMAT
-from prompts.online.system import SYSTEM_INSTRUCTION
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from utils.genai import logger, courseoutline_md, format_weekly_plan, generate_overall_plan
+from utils.prompt_cache import GenerationJob, prompt_caches
 from models.course_models import CourseOutline, Week, Milestone
-from config.config import API_KEYS
+from config.config import WEEK_CONCURRENCY
 
 class GenaiService:
-    def generate_week_content(
+    def job(self, user_instruction: str, model_id: int, job_id: Optional[str] = None) -> GenerationJob:
+        """
+        Requests of one course generation job.
+
+        The static stage prompts are served from the process-wide prompt
+        caches, or inline where a cache does not pay off. The week requests
+        share the learner's requirements and the outline, which the job may
+        cache alongside the week prompt; close the job to delete that cache.
+        """
+        return GenerationJob(prompt_caches, model_id, user_instruction, job_id=job_id)
+
+    async def generate_week_content(
         self,
-        client: genai.Client,
-        model_id: int,
+        job: GenerationJob,
         week: str,
-        cache_name: str,
+        result_md: str,
         response_schema: Any,
-        results: List[Any],
-        index: int
-    ) -> None:
+        index: int,
+        total: int = 1
+    ) -> Dict[str, Any]:
         """
-        Generate content for a single week (thread-safe).
+        Generate content for a single week.
         
         Args:
-            client: GenAI client instance.
-            model_id: ID of the model to use.
+            job: The generation job.
             week: Week data for content generation.
-            cache_name: Cache name for generation.
+            result_md: Course outline in Markdown.
             response_schema: Schema for response validation.
-            results: List to store results.
-            index: Index for storing result.
+            index: Position of the week in the outline.
+            total: Weeks of the course, which share the stage's prompt.
+
+        Returns:
+            The generated week.
         """
         try:
-            week_response = generate_content(
-                client=client,
-                model_id=model_id,
-                contents=f"Generate a week's content for this course: {week}",
-                cache_name=cache_name,
-                response_schema=response_schema
+            week_response = await job.generate(
+                "weekly_content",
+                [f"Generate a week's content for this course: {week}"],
+                response_schema,
+                expected_uses=total,
+                context=[result_md]
             )
-            results[index] = week_response
             logger.info(f"Generated content for week {index + 1}")
+            return week_response
         except Exception as e:
             logger.error(f"Failed to generate content for week {index + 1}: {str(e)}")
             raise
 
-    async def generate_course_outline(self, user_instruction: str, model_id: int, response_dir: str) -> Dict[str, Any]:
+    async def generate_course_outline(
+        self,
+        response_dir: str,
+        job: GenerationJob
+    ) -> Dict[str, Any]:
         """
-        Generate the course outline using the provided user instruction and model ID.
+        Generate the course outline from the job's user instruction and model.
         
         Args:
-            user_instruction (str): Formatted user input for course generation.
-            model_id (int): ID of the model to use for generation.
             response_dir (str): Directory to save the generated output.
+            job (GenerationJob): The generation job.
         
         Returns:
             Dict[str, Any]: Generated course outline.
@@ -62,22 +73,11 @@ class GenaiService:
             Exception: If generation or saving fails.
         """
         logger.info("Generating course outline")
-        outline_client = initialize_client(API_KEYS)
-        outline_cache_name = None
         try:
-            outline_cache_name = create_cache(
-                client=outline_client,
-                model_id=model_id,
-                display_name="course_outline",
-                system_instruction=(SYSTEM_INSTRUCTION, COURSE_OUTLINE_SYSTEM, COURSE_OUTLINE_FORMAT),
-                contents=(user_instruction)
-            )
-            course_outline = generate_content(
-                client=outline_client,
-                model_id=model_id,
-                contents=user_instruction,
-                cache_name=outline_cache_name,
-                response_schema=CourseOutline
+            course_outline = await job.generate(
+                "course_outline",
+                [],
+                CourseOutline
             )
             result_md = courseoutline_md(course_outline)
             with open(f"{response_dir}/course_outline.md", 'w') as f:
@@ -86,25 +86,26 @@ class GenaiService:
         except Exception as e:
             logger.error(f"Failed to generate course outline: {str(e)}")
             raise
-        finally:
-            if outline_cache_name:
-                delete_cache(outline_client, outline_cache_name)
 
     async def generate_weekly_content(
         self,
-        user_instruction: str,
-        model_id: int,
         course_outline: Dict[str, Any],
-        response_dir: str
+        response_dir: str,
+        job: GenerationJob,
+        on_week_done: Optional[Callable[[int, int, int], Awaitable[None]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate content for all weeks concurrently.
+
+        Weeks run as asyncio tasks on the SDK's async client, at most
+        WEEK_CONCURRENCY at a time, so the event loop stays free while they
+        are generated. A week that fails is logged and left out.
         
         Args:
-            user_instruction (str): Formatted user input.
-            model_id (int): ID of the model to use.
             course_outline (Dict[str, Any]): Course outline data.
             response_dir (str): Directory to save the generated output.
+            job (GenerationJob): The generation job.
+            on_week_done: Awaited with (week index, weeks finished, total weeks) as each week finishes.
         
         Returns:
             List[Dict[str, Any]]: List of weekly content.
@@ -113,30 +114,32 @@ class GenaiService:
             Exception: If generation or saving fails.
         """
         logger.info("Generating weekly content")
-        week_client = initialize_client(API_KEYS)
-        week_cache_name = None
         try:
             result_md = open(f"{response_dir}/course_outline.md", 'r').read()
-            week_cache_name = create_cache(
-                client=week_client,
-                model_id=model_id,
-                display_name="weekly_content",
-                system_instruction=(SYSTEM_INSTRUCTION, WEEK_SYSTEM, WEEK_FORMAT),
-                contents=(user_instruction, result_md)
-            )
-            results = [None] * len(course_outline['weeks'])
-            threads = []
+            semaphore = asyncio.Semaphore(WEEK_CONCURRENCY)
+            total = len(course_outline['weeks'])
+            finished = 0
 
-            for i, week in enumerate(course_outline['weeks']):
-                thread = threading.Thread(
-                    target=self.generate_week_content,
-                    args=(week_client, model_id, week, week_cache_name, Week, results, i)
-                )
-                threads.append(thread)
-                thread.start()
+            async def run_week(index: int, week: str) -> Optional[Dict[str, Any]]:
+                nonlocal finished
+                async with semaphore:
+                    try:
+                        week_response = await self.generate_week_content(job, week, result_md, Week, index, total)
+                    except Exception:
+                        week_response = None
+                finished += 1
+                if on_week_done is not None:
+                    await on_week_done(index, finished, total)
+                return week_response
 
-            for thread in threads:
-                thread.join()
+            tasks = [asyncio.create_task(run_week(i, week)) for i, week in enumerate(course_outline['weeks'])]
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                # Caller cancelled or progress reporting failed: stop the remaining weeks
+                for task in tasks:
+                    task.cancel()
+                raise
 
             course_weeks = [r for r in results if r is not None]
             with open(f"{response_dir}/course_weeks.md", 'w') as f:
@@ -146,9 +149,6 @@ class GenaiService:
         except Exception as e:
             logger.error(f"Failed to generate weekly content: {str(e)}")
             raise
-        finally:
-            if week_cache_name:
-                delete_cache(week_client, week_cache_name)
 
     async def generate_weekly_plans(self, course_weeks: List[Dict[str, Any]], response_dir: str) -> List[str]:
         """
@@ -177,19 +177,17 @@ class GenaiService:
 
     async def generate_course_milestone(
         self,
-        user_instruction: str,
-        model_id: int,
         week_plans: List[str],
-        response_dir: str
+        response_dir: str,
+        job: GenerationJob
     ) -> Dict[str, Any]:
         """
         Generate the course milestone.
         
         Args:
-            user_instruction (str): Formatted user input.
-            model_id (int): ID of the model to use.
             week_plans (List[str]): List of weekly plans.
             response_dir (str): Directory to save the generated output.
+            job (GenerationJob): The generation job.
         
         Returns:
             Dict[str, Any]: Generated course milestone.
@@ -198,32 +196,19 @@ class GenaiService:
             Exception: If generation or saving fails.
         """
         logger.info("Generating course milestone")
-        milestone_client = initialize_client(API_KEYS)
-        milestone_cache_name = None
         try:
             result_md = open(f"{response_dir}/course_outline.md", 'r').read()
             overall_plan = generate_overall_plan(week_plans)
-            milestone_cache_name = create_cache(
-                client=milestone_client,
-                model_id=model_id,
-                display_name="course_milestone",
-                system_instruction=(SYSTEM_INSTRUCTION, MILESTONE_SYSTEM, MILESTONE_FORMAT),
-                contents=(user_instruction, result_md)
-            )
-            course_milestone = generate_content(
-                client=milestone_client,
-                model_id=model_id,
-                contents=overall_plan,
-                cache_name=milestone_cache_name,
-                response_schema=Milestone
+            course_milestone = await job.generate(
+                "course_milestone",
+                [overall_plan],
+                Milestone,
+                context=[result_md]
             )
             return course_milestone
         except Exception as e:
             logger.error(f"Failed to generate course milestone: {str(e)}")
             raise
-        finally:
-            if milestone_cache_name:
-                delete_cache(milestone_client, milestone_cache_name)
 
     async def transform_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
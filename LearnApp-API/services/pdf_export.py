@@ -0,0 +1,335 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+from config.config import (
+    COURSE_CACHE_SIZE, EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES,
+    PDF_RENDER_WORKERS, PDF_RENDER_WAIT, PDF_RENDER_TIMEOUT, PDF_ASYNC_THRESHOLD
+)
+from services.course_store import CourseStore, course_store
+from utils.course_cache import CourseCache
+from utils.export_cache import ExportCache
+from utils.helper import convert_json_to_markdown, iter_scope_markdown
+from utils.pdf_render import PDF_OPTIONS, PDF_LAYOUT_VERSION, render_pdf
+from utils.serializer import dumps_str
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Finished or failed jobs stay pollable for this long
+JOB_RETENTION_SECONDS = 600
+
+# Times a render killed along with its pool (by another job's timeout) is retried
+RENDER_RETRIES = 2
+
+
+class PdfExporter:
+    """
+    Course outline PDFs, rendered once per distinct content in a process pool.
+
+    The cache key is a SHA-256 of the Markdown that would be rendered plus the
+    renderer options, so edits that do not show up in the PDF (block
+    completion) keep hitting the same file. The key of each course version is
+    memoized, so a repeat export of an unchanged course skips building the
+    Markdown as well as rendering. An export limited to one week or module
+    renders only that slice and is cached as an entry of its own.
+
+    Rendering is CPU-bound, so it runs in a separate process pool capped at
+    `workers` concurrent renders; further jobs wait in a queue. Jobs are keyed
+    by the cache key, so concurrent exports of the same content share one
+    render. A request waits up to `wait` seconds and otherwise gets the job to
+    poll; very large outlines go straight to polling. A render that exceeds
+    `timeout` fails and its pool is replaced, killing the stuck process; the
+    other renders that die with that pool are retried on the new one.
+
+    The export cache is opened by start(), from the app's lifespan: opening
+    it scans the cache directory, which should not happen at import time.
+    """
+
+    def __init__(
+        self,
+        store: CourseStore,
+        cache: Optional[ExportCache] = None,
+        workers: int = PDF_RENDER_WORKERS,
+        wait: float = PDF_RENDER_WAIT,
+        timeout: float = PDF_RENDER_TIMEOUT,
+        async_threshold: int = PDF_ASYNC_THRESHOLD
+    ):
+        self.store = store
+        self.cache = cache
+        self.workers = workers
+        self.wait = wait
+        self.timeout = timeout
+        self.async_threshold = async_threshold
+        self._keys = CourseCache(COURSE_CACHE_SIZE)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._stats = {
+            "renders": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "total_render_ms": 0.0,
+            "max_render_ms": 0.0
+        }
+
+    @staticmethod
+    def cache_key(markdown_content: str, title: str, options: Dict[str, Any] = PDF_OPTIONS) -> str:
+        digest = hashlib.sha256()
+        digest.update(dumps_str({"layout": PDF_LAYOUT_VERSION, "options": options, "title": title}).encode("utf-8"))
+        digest.update(markdown_content.encode("utf-8"))
+        return f"{digest.hexdigest()}.pdf"
+
+    def start(self) -> None:
+        """Open the export cache, unless one was passed in."""
+        if self.cache is None:
+            self.cache = ExportCache(EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES, temp_max_age=self.timeout)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a server process that holds threads and SQLite connections is unsafe
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _recycle_pool(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # ProcessPoolExecutor cannot cancel a running call; terminate its workers instead
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _markdown(self, course_id: str, week_id: Optional[str], module_id: Optional[str]) -> Tuple[str, str]:
+        """(markdown, title) of the requested slice of a course."""
+        if week_id is None and module_id is None:
+            course_data = self.store.load_course(course_id)
+            if course_data is None:
+                raise LookupError(f"Course not found for course_id: {course_id}")
+            return convert_json_to_markdown(course_data), course_data["course_outline"]["title"]
+
+        scope = self.store.load_scope(course_id, week_id, module_id)
+        week, module = scope["week"], scope["module"]
+        title = f"{scope['title']} - Week {week['week_number']}: {week['week_topic']}"
+        if module is not None:
+            title = f"{scope['title']} - {module['module_title']}"
+        return "".join(iter_scope_markdown(scope["title"], week, module)), title
+
+    def _resolve(
+        self,
+        course_id: str,
+        week_id: Optional[str] = None,
+        module_id: Optional[str] = None
+    ) -> Tuple[str, Optional[str], Optional[Tuple[str, str]]]:
+        """
+        Cache key of a course's (or a slice's) PDF and the cached path on a hit.
+
+        Returns:
+            (key, path or None, (markdown, title) when it had to be built).
+        """
+        version = self.store.course_version(course_id)
+        if version is None:
+            raise LookupError(f"Course not found for course_id: {course_id}")
+
+        scope = (course_id, week_id, module_id)
+        key = self._keys.get(scope, version)
+        if key is not None:
+            path = self.cache.get(key)
+            if path is not None:
+                return key, path, None
+
+        markdown_content, title = self._markdown(course_id, week_id, module_id)
+        key = self.cache_key(markdown_content, title)
+        self._keys.put(scope, version, key)
+        return key, self.cache.get(key), (markdown_content, title)
+
+    def _submit(self, key: str, course_id: str, markdown_content: str, title: str) -> Dict[str, Any]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        job = {
+            "job_id": key[:-len(".pdf")],
+            "course_id": course_id,
+            "status": "queued",
+            "error": None,
+            "created": time.time(),
+            "finished": None
+        }
+        job["task"] = asyncio.create_task(self._run(key, job, markdown_content, title))
+        self._jobs[job["job_id"]] = job
+        return job
+
+    async def _run(self, key: str, job: Dict[str, Any], markdown_content: str, title: str) -> None:
+        loop = asyncio.get_running_loop()
+        tmp_path = None
+        try:
+            async with self._slots:
+                job["status"] = "rendering"
+                # Created only once rendering starts, so a temp file older than the timeout is abandoned
+                tmp_path = self.cache.temp_path(suffix=".pdf")
+                for attempt in range(RENDER_RETRIES + 1):
+                    pool = self._executor()
+                    start = time.perf_counter()
+                    render = loop.run_in_executor(pool, render_pdf, markdown_content, title, tmp_path)
+                    try:
+                        await asyncio.wait_for(render, timeout=self.timeout)
+                        break
+                    except asyncio.TimeoutError:
+                        self._stats["timeouts"] += 1
+                        self._recycle_pool()
+                        raise TimeoutError(f"PDF rendering exceeded {self.timeout} seconds")
+                    except (BrokenProcessPool, asyncio.CancelledError) as e:
+                        if isinstance(e, asyncio.CancelledError) and asyncio.current_task().cancelling():
+                            # This job itself was cancelled
+                            raise
+                        if isinstance(e, BrokenProcessPool) and pool is self._pool:
+                            # A worker died on its own: replace the pool for every job
+                            self._recycle_pool()
+                        # Retried only if the pool was replaced under it
+                        if pool is self._pool or attempt == RENDER_RETRIES:
+                            if isinstance(e, asyncio.CancelledError):
+                                # Killed with its pool rather than cancelled: a failure of this job
+                                raise RuntimeError("render worker was recycled") from e
+                            raise
+                        self._stats["retries"] += 1
+                        logger.warning(f"PDF render for course {job['course_id']} was killed with its pool, retrying")
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            self.cache.put(key, tmp_path)
+            job["status"] = "done"
+            self._stats["renders"] += 1
+            self._stats["total_render_ms"] += elapsed_ms
+            self._stats["max_render_ms"] = max(self._stats["max_render_ms"], elapsed_ms)
+            logger.info(f"Rendered PDF for course {job['course_id']} in {elapsed_ms:.1f} ms")
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e) or type(e).__name__
+            self._stats["failures"] += 1
+            logger.error(f"PDF rendering failed for course {job['course_id']}: {job['error']}")
+        finally:
+            if job["status"] in ("queued", "rendering"):
+                # Cancelled: never leave a job in flight that _job_for would keep handing out
+                job["status"] = "failed"
+                job["error"] = "cancelled"
+            job["finished"] = time.time()
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job["finished"] and job["finished"] < cutoff]:
+            del self._jobs[job_id]
+
+    def _view(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        view = {key: job[key] for key in ("job_id", "course_id", "status", "error")}
+        if job["status"] == "done":
+            view["path"] = self.cache.get(f"{job['job_id']}.pdf")
+            if view["path"] is None:
+                # Evicted since it was rendered; the next export renders it again
+                view["status"] = "expired"
+        return view
+
+    def _job_for(self, key: str, course_id: str, markdown_content: str, title: str) -> Dict[str, Any]:
+        job = self._jobs.get(key[:-len(".pdf")])
+        if job is None or job["status"] in ("failed", "done"):
+            # No render in flight (a finished one was evicted since): start one
+            job = self._submit(key, course_id, markdown_content, title)
+        return job
+
+    async def render(self, course_id: str, markdown_content: str, title: str) -> Dict[str, Any]:
+        """
+        PDF of Markdown that was already built, waiting however long the queue takes.
+
+        For callers that hold the document anyway (bulk export); it shares the
+        cache, the pool and in-flight jobs with export().
+
+        Returns:
+            Job view with status "done" (with "path"), "failed" or "expired".
+        """
+        self._prune()
+        key = self.cache_key(markdown_content, title)
+        path = self.cache.get(key)
+        if path is not None:
+            return {"job_id": key[:-len(".pdf")], "course_id": course_id, "status": "done", "error": None, "path": path}
+        job = self._job_for(key, course_id, markdown_content, title)
+        await asyncio.shield(job["task"])
+        return self._view(job)
+
+    async def export(
+        self,
+        course_id: str,
+        wait: Optional[float] = None,
+        week_id: Optional[str] = None,
+        module_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Export a course outline PDF.
+
+        Args:
+            course_id: Identifier of the course.
+            wait: Seconds to wait for a render before returning the pending job.
+            week_id: Limit the export to this week.
+            module_id: Limit the export to this module.
+
+        Returns:
+            Job view: status is "done" (with "path"), "queued", "rendering" or "failed".
+
+        Raises:
+            LookupError: If the course, week or module does not exist.
+        """
+        self._prune()
+        key, path, source = self._resolve(course_id, week_id, module_id)
+        job_id = key[:-len(".pdf")]
+        if path is not None:
+            return {"job_id": job_id, "course_id": course_id, "status": "done", "error": None, "path": path}
+
+        job = self._job_for(key, course_id, *source)
+
+        wait = self.wait if wait is None else wait
+        if len(source[0]) > self.async_threshold:
+            wait = 0
+        try:
+            await asyncio.wait_for(asyncio.shield(job["task"]), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        return self._view(job)
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current view of a render job, or None if it is unknown or expired."""
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return self._view(job)
+        path = self.cache.get(f"{job_id}.pdf")
+        if path is not None:
+            return {"job_id": job_id, "course_id": None, "status": "done", "error": None, "path": path}
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        renders = self._stats["renders"]
+        return {
+            **(self.cache.stats() if self.cache is not None else {}),
+            **self._stats,
+            "workers": self.workers,
+            "queue_depth": sum(1 for job in self._jobs.values() if job["status"] == "queued"),
+            "rendering": sum(1 for job in self._jobs.values() if job["status"] == "rendering"),
+            "total_render_ms": round(self._stats["total_render_ms"], 2),
+            "max_render_ms": round(self._stats["max_render_ms"], 2),
+            "avg_render_ms": round(self._stats["total_render_ms"] / renders, 2) if renders else 0.0
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+pdf_exporter = PdfExporter(course_store)
@@ -0,0 +1,239 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+from config.config import PROGRESS_LOG_PATH, COURSE_MAP_PATH
+from utils.serializer import dumps, dumps_str, loads, load_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single worker assumed
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Courses whose last recorded progress map is kept in memory, so the course
+# watcher can recognise the progress.json files this process wrote itself
+RECENT_PROGRESS_SIZE = 1024
+
+
+class ProgressLog:
+    """
+    Append-only store for course generation progress.
+
+    Every progress update is appended as one JSON line to the event log, so a
+    write costs the same regardless of how many courses exist. The log is
+    periodically folded into the course map snapshot (1coursemaps.json) and
+    truncated. Readers rebuild the course map as snapshot + replayed events.
+
+    record() only appends; fsyncs and compaction run on a background thread,
+    so callers on the event loop never wait for the disk. Compaction builds
+    the new snapshot while appends continue and holds the exclusive lock only
+    to swap it in and carry over the events appended meanwhile.
+    """
+
+    def __init__(
+        self,
+        log_path: str = PROGRESS_LOG_PATH,
+        snapshot_path: str = COURSE_MAP_PATH,
+        fsync_interval: float = 1.0,
+        compact_every: int = 5000
+    ):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pending_fsync = False
+        self._appended = 0
+        self._compact_requested = False
+        self._wake = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _open(self) -> int:
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            self._fd = os.open(self.log_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _lock_fd(self, fd: int, exclusive: bool) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock_fd(self, fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def record(self, request_id: str, progress_map: Dict[str, Any], step: Optional[str] = None) -> None:
+        """
+        Append a progress event.
+
+        Args:
+            request_id: Course/request identifier.
+            progress_map: Current progress map of the request.
+            step: If given, only this step's state is recorded; otherwise the whole map.
+        """
+        event = {"id": str(request_id), "ts": time.time()}
+        if step is None:
+            event["progress"] = progress_map
+        else:
+            event["step"] = step
+            event["state"] = progress_map[step]
+        line = (dumps_str(event) + "\n").encode("utf-8")
+
+        with self._lock:
+            fd = self._open()
+            self._lock_fd(fd, exclusive=False)
+            try:
+                # O_APPEND + a single write keeps concurrent appenders from interleaving
+                os.write(fd, line)
+            finally:
+                self._unlock_fd(fd)
+            self._appended += 1
+            self._pending_fsync = True
+            self._recent[event["id"]] = {key: dict(state) if isinstance(state, dict) else state for key, state in progress_map.items()}
+            self._recent.move_to_end(event["id"])
+            if len(self._recent) > RECENT_PROGRESS_SIZE:
+                self._recent.popitem(last=False)
+            if self._appended >= self.compact_every and not self._compact_requested:
+                self._compact_requested = True
+                self._wake.set()
+            if self._syncer is None:
+                self._syncer = threading.Thread(target=self._sync_loop, name="progress-log-sync", daemon=True)
+                self._syncer.start()
+
+    def _sync_loop(self) -> None:
+        while True:
+            self._wake.wait(self.fsync_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if self._compact_requested:
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Progress log maintenance failed: {str(e)}")
+
+    def flush(self) -> None:
+        """Force pending events to disk. Blocks on the disk; call it off the event loop."""
+        with self._lock:
+            if self._fd is None or not self._pending_fsync:
+                return
+            fd = self._fd
+            self._pending_fsync = False
+        os.fsync(fd)
+
+    def _replay(self, course_map: Dict[str, Any], lines: Iterable[bytes]) -> Dict[str, Any]:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                event = loads(line)
+            except ValueError:
+                # A torn trailing line from a crash; everything before it is intact
+                logger.warning(f"Skipping unreadable progress event in {self.log_path}")
+                continue
+            if "progress" in event:
+                course_map[event["id"]] = event["progress"]
+            else:
+                course_map.setdefault(event["id"], {})[event["step"]] = event["state"]
+        return course_map
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        return load_file(self.snapshot_path)
+
+    def _read_log(self, fd: int, start: int = 0) -> bytes:
+        return os.pread(fd, max(0, os.fstat(fd).st_size - start), start)
+
+    def course_map(self) -> Dict[str, Any]:
+        """
+        Rebuild the full request_id -> progress map mapping.
+
+        Reads through a descriptor of its own and never takes the appenders'
+        lock, so record() is not held up by a rebuild. Its shared flock is
+        independent of the appenders' and keeps a compaction from swapping the
+        snapshot between the two reads.
+        """
+        try:
+            fd = os.open(self.log_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return self._load_snapshot()
+        try:
+            self._lock_fd(fd, exclusive=False)
+            return self._replay(self._load_snapshot(), self._read_log(fd).splitlines())
+        finally:
+            # Closing the descriptor releases its flock
+            os.close(fd)
+
+    def recorded(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Progress map this process last recorded for a request, while it is among the recent ones."""
+        with self._lock:
+            return self._recent.get(str(request_id))
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self.course_map().get(str(request_id))
+
+    @contextmanager
+    def _compaction_lock(self) -> Iterator[bool]:
+        # One compactor at a time across uvicorn workers; the others skip their turn
+        with open(f"{self.log_path}.compact.lock", 'a') as lock_file:
+            if fcntl is None:
+                yield True
+                return
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def compact(self) -> None:
+        """Fold the event log into the snapshot and truncate the log."""
+        with self._lock:
+            fd = self._open()
+            self._compact_requested = False
+        with self._compaction_lock() as acquired:
+            if not acquired:
+                return
+            # Only compactors rewrite the snapshot or shrink the log, so this reads a stable prefix
+            data = self._read_log(fd)
+            folded = data.rfind(b"\n") + 1
+            course_map = self._replay(self._load_snapshot(), data[:folded].splitlines())
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(dumps(course_map, indent=2))
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._lock:
+                self._lock_fd(fd, exclusive=True)
+                try:
+                    tail = self._read_log(fd, folded)
+                    os.replace(tmp_path, self.snapshot_path)
+                    # Truncate in place so other workers' O_APPEND descriptors stay valid
+                    os.ftruncate(fd, 0)
+                    if tail:
+                        os.write(fd, tail)
+                    self._appended = tail.count(b"\n")
+                    self._pending_fsync = True
+                finally:
+                    self._unlock_fd(fd)
+            self.flush()
+            logger.info(f"Compacted progress log into {self.snapshot_path} ({len(course_map)} courses)")
+
+
+progress_log = ProgressLog()
@@ -0,0 +1,72 @@
+import copy
+import os
+import threading
+
+from services.cold_storage import ColdStorage
+from services.course_store import CourseStore
+
+COURSE = {
+    "course_outline": {
+        "title": "Course",
+        "overview": "Overview",
+        "total_weeks": 1,
+        "weeks": [{
+            "week_number": 1,
+            "week_topic": "Basics",
+            "week_modules": [{
+                "module_title": "Intro",
+                "content_blocks": [{"block_title": "First"}, {"block_title": "Second"}]
+            }]
+        }]
+    }
+}
+
+
+def make_cold_storage(tmp_path):
+    store = CourseStore(str(tmp_path / "courses.db"))
+    store.save_course("c1", copy.deepcopy(COURSE), created_at="2024-01-01T00:00:00")
+    return ColdStorage(store, responses_dir=str(tmp_path / "responses"), archive_dir=str(tmp_path / "archive"))
+
+
+def test_write_during_archive_keeps_course_live(tmp_path):
+    cold = make_cold_storage(tmp_path)
+    store = cold.store
+    block_id = store.block_ids("c1")["1.1.1"]
+    take_snapshot = cold._snapshot
+
+    def snapshot_then_chat(course_id, created_at):
+        snapshot = take_snapshot(course_id, created_at)
+        # A tutor turn commits after the snapshot, before the rows are dropped
+        store.append_chat_turn(course_id, block_id, [
+            {"role": "user", "message": "Still here?"},
+            {"role": "AI", "message": "Yes.", "model": "m"}
+        ])
+        return snapshot
+    cold._snapshot = snapshot_then_chat
+
+    assert cold.archive("c1", "2024-01-01T00:00:00") is None
+    assert not store.is_archived("c1")
+    assert not os.path.exists(cold._archive_path("c1"))
+    assert [pair[0]["message"] for pair in store.get_chat_history(block_id)] == ["Still here?"]
+
+
+def test_concurrent_rehydrations_restore_once(tmp_path):
+    cold = make_cold_storage(tmp_path)
+    assert cold.archive("c1", "2024-01-01T00:00:00") is not None
+    results, errors = [], []
+
+    def rehydrate():
+        try:
+            results.append(ColdStorage(cold.store, cold.responses_dir, cold.archive_dir).rehydrate("c1"))
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=rehydrate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert sum(result is not None for result in results) == 1
+    assert not cold.store.is_archived("c1")
+    assert len(cold.store.block_ids("c1")) == 2
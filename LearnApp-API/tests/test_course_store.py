@@ -0,0 +1,80 @@
+import json
+import os
+import time
+from services.course_store import CourseStore
+
+
+def make_course(title="Course"):
+    return {
+        "course_outline": {
+            "title": title,
+            "overview": "Overview",
+            "total_weeks": 1,
+            "weeks": [{
+                "week_number": 1,
+                "week_topic": "Basics",
+                "hours_per_week": 4,
+                "week_modules": [{
+                    "module_title": "Intro",
+                    "duration_hours": 2,
+                    "content_blocks": [
+                        {"block_title": "First", "length": 30, "type": "reading", "objectives": [], "references": []},
+                        {"block_title": "Second", "length": 20, "type": "video", "objectives": [], "references": []}
+                    ]
+                }]
+            }]
+        }
+    }
+
+
+def write_result(responses_dir, course_id, course_data):
+    course_dir = os.path.join(responses_dir, course_id)
+    os.makedirs(course_dir, exist_ok=True)
+    path = os.path.join(course_dir, "result.json")
+    with open(path, "w") as f:
+        json.dump(course_data, f)
+    # Newer than the store's last write, as after a hand edit or a restore
+    future = time.time() + 5
+    os.utime(path, (future, future))
+
+
+def test_reimport_keeps_chat_and_progress(tmp_path):
+    store = CourseStore(str(tmp_path / "courses.db"))
+    responses_dir = str(tmp_path / "responses")
+    write_result(responses_dir, "c1", make_course())
+    assert store.import_course("c1", responses_dir)
+
+    block_ids = store.block_ids("c1")
+    first = block_ids["1.1.1"]
+    store.set_block_completed("c1", first, True)
+    store.append_chat_turn("c1", first, [
+        {"role": "user", "message": "What is this?"},
+        {"role": "AI", "message": "An intro.", "model": "m"}
+    ])
+
+    # The file still has completed=false and no chat, and the title changed
+    write_result(responses_dir, "c1", make_course(title="Course, edited"))
+    assert store.import_course("c1", responses_dir)
+
+    assert store.block_ids("c1") == block_ids
+    course = store.load_course("c1")
+    assert course["course_outline"]["title"] == "Course, edited"
+    blocks = course["course_outline"]["weeks"][0]["week_modules"][0]["content_blocks"]
+    assert [block["completed"] for block in blocks] == [True, False]
+    history = store.get_chat_history(first)
+    assert [pair[0]["message"] for pair in history] == ["What is this?"]
+    summary = store.list_course_summaries()[0]
+    assert (summary["total_blocks"], summary["completed_blocks"]) == (2, 1)
+
+
+def test_reimport_drops_removed_blocks(tmp_path):
+    store = CourseStore(str(tmp_path / "courses.db"))
+    course = make_course()
+    store.save_course("c1", course)
+
+    edited = make_course()
+    del edited["course_outline"]["weeks"][0]["week_modules"][0]["content_blocks"][1]
+    store.save_course("c1", edited)
+
+    assert list(store.block_ids("c1")) == ["1.1.1"]
+    assert store.list_course_summaries()[0]["total_blocks"] == 1
@@ -0,0 +1,48 @@
+import json
+import os
+
+from services.course_store import CourseStore
+from services.course_watcher import CourseWatcher
+from services.progress_log import ProgressLog
+
+
+def make_watcher(tmp_path):
+    progress = ProgressLog(
+        log_path=str(tmp_path / "progress.log"),
+        snapshot_path=str(tmp_path / "coursemaps.json"),
+    )
+    store = CourseStore(str(tmp_path / "courses.db"))
+    return CourseWatcher(store, progress, responses_dir=str(tmp_path / "responses"))
+
+
+def write_progress(watcher, course_id, progress_map):
+    course_dir = os.path.join(watcher.responses_dir, course_id)
+    os.makedirs(course_dir, exist_ok=True)
+    path = os.path.join(course_dir, "progress.json")
+    with open(path, "w") as f:
+        json.dump(progress_map, f)
+    return path
+
+
+def test_own_progress_file_is_not_replayed(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path)
+    progress_map = {"course_outline": {"status": 2, "path": None}}
+    watcher.progress.record("c1", progress_map)
+    # Mutated after recording, as the routes do with their live map
+    progress_map["course_outline"]["status"] = 3
+    path = write_progress(watcher, "c1", {"course_outline": {"status": 2, "path": None}})
+
+    def rebuild():
+        raise AssertionError("rebuilt the whole course map")
+    monkeypatch.setattr(watcher.progress, "course_map", rebuild)
+
+    assert watcher._replay_progress("c1", path) is False
+
+
+def test_foreign_progress_file_is_replayed(tmp_path):
+    watcher = make_watcher(tmp_path)
+    watcher.progress.record("c1", {"course_outline": {"status": 1}})
+    path = write_progress(watcher, "c1", {"course_outline": {"status": 2}})
+
+    assert watcher._replay_progress("c1", path) is True
+    assert watcher.progress.get("c1") == {"course_outline": {"status": 2}}
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.key_pool import KeyPool, NoUsableKeyError
+
+
+class AuthError(Exception):
+    code = 403
+
+
+async def use_key(pool):
+    async with pool.lease() as lease:
+        return lease.key
+
+
+def test_revoked_only_key_fails_fast():
+    pool = KeyPool(["key-a"], revoked_cooldown=3600, max_wait=5)
+
+    async def run():
+        with pytest.raises(AuthError):
+            async with pool.lease():
+                raise AuthError("403 PERMISSION_DENIED")
+        start = time.monotonic()
+        with pytest.raises(NoUsableKeyError):
+            await use_key(pool)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 1
+    assert pool.stats()["rejected"] == 1
+
+
+def test_short_cooldown_is_waited_out():
+    pool = KeyPool(["key-a"], cooldown=0.2, max_wait=5)
+
+    async def run():
+        with pytest.raises(Exception):
+            async with pool.lease():
+                raise Exception("429 RESOURCE_EXHAUSTED")
+        return await use_key(pool)
+
+    assert asyncio.run(run()) == "key-a"
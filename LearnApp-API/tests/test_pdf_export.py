@@ -0,0 +1,38 @@
+import asyncio
+from concurrent.futures import Executor, Future
+
+from services.course_store import CourseStore
+from services.pdf_export import RENDER_RETRIES, PdfExporter
+from utils.export_cache import ExportCache
+
+
+class RecycledPool(Executor):
+    """A pool that another job's timeout replaces while this render is running."""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.exporter._pool = None
+        # shutdown(cancel_futures=True) cancels the calls of the old pool
+        future.cancel()
+        return future
+
+
+def test_render_killed_on_every_attempt_fails(tmp_path):
+    exporter = PdfExporter(
+        CourseStore(str(tmp_path / "courses.db")),
+        cache=ExportCache(str(tmp_path / "exports"), 1024 * 1024, temp_max_age=60)
+    )
+    exporter._executor = lambda: RecycledPool(exporter)
+    # The Markdown is built already; only the render is under test
+    exporter._resolve = lambda course_id, *scope: ("k" * 64 + ".pdf", None, ("# Course", "Course"))
+
+    async def run():
+        return await exporter.export("c1", wait=5)
+    view = asyncio.run(run())
+
+    assert view["status"] == "failed"
+    assert view["error"] == "render worker was recycled"
+    assert exporter.stats()["retries"] == RENDER_RETRIES
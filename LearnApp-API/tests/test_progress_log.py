@@ -0,0 +1,57 @@
+import threading
+
+from services.progress_log import ProgressLog
+
+
+def make_log(tmp_path, compact_every=5000):
+    return ProgressLog(
+        log_path=str(tmp_path / "progress.log"),
+        snapshot_path=str(tmp_path / "coursemaps.json"),
+        compact_every=compact_every,
+    )
+
+
+def test_compact_folds_log_into_snapshot(tmp_path):
+    log = make_log(tmp_path)
+    log.record("a", {"outline": "done", "week_1": "pending"})
+    log.record("a", {"outline": "done", "week_1": "done"}, step="week_1")
+    log.record("b", {"outline": "pending"})
+    log.compact()
+
+    assert (tmp_path / "progress.log").stat().st_size == 0
+    assert log.course_map() == {
+        "a": {"outline": "done", "week_1": "done"},
+        "b": {"outline": "pending"},
+    }
+
+
+def test_compact_keeps_events_recorded_meanwhile(tmp_path):
+    log = make_log(tmp_path, compact_every=50)
+    writers = [
+        threading.Thread(target=lambda i=i: [
+            log.record(f"course-{i}", {"step": n}) for n in range(400)
+        ])
+        for i in range(4)
+    ]
+    for thread in writers:
+        thread.start()
+    for _ in range(20):
+        log.compact()
+        assert all(progress["step"] >= 0 for progress in log.course_map().values())
+    for thread in writers:
+        thread.join()
+    log.compact()
+
+    assert log.course_map() == {f"course-{i}": {"step": 399} for i in range(4)}
+
+
+def test_course_map_does_not_wait_for_appenders(tmp_path):
+    log = make_log(tmp_path)
+    log.record("a", {"outline": "done"})
+    result = {}
+    with log._lock:
+        reader = threading.Thread(target=lambda: result.update(log.course_map()))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    assert result == {"a": {"outline": "done"}}
@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from config.config import ARTIFACT_INDENT
+from utils.serializer import dumps
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+class ArtifactWriter:
+    """
+    Writes JSON artifacts without blocking the event loop.
+
+    Serialization and file I/O run in a small thread pool. Each write goes to a
+    temp file in the target directory which is then atomically renamed over the
+    destination, so readers never see a half-written file. Writes to the same
+    path are serialized; while one is in flight, further writes to that path
+    collapse into a single pending write carrying the latest payload.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._stats = {
+            "writes": 0,
+            "coalesced": 0,
+            "failures": 0,
+            "bytes_written": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0
+        }
+
+    @staticmethod
+    def _write_sync(data: Any, path: str, indent: int | None) -> int:
+        payload = dumps(data, indent=indent)
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return len(payload)
+
+    async def write_json(self, data: Any, path: str, indent: int | None = ARTIFACT_INDENT) -> None:
+        """
+        Serialize `data` to `path` in the worker pool and atomically replace the file.
+
+        Args:
+            data: JSON-serializable object.
+            path: Destination file path.
+            indent: None for compact JSON, otherwise the pretty-print indentation.
+        """
+        key = os.path.normpath(path)
+        pending = self._pending.get(key)
+        if pending is not None:
+            # A write for this path is already queued: ride along with the newest payload
+            pending["data"] = data
+            pending["indent"] = indent
+            self._stats["coalesced"] += 1
+            await asyncio.shield(pending["future"])
+            return
+
+        loop = asyncio.get_running_loop()
+        entry = {"data": data, "indent": indent, "future": loop.create_future()}
+        entry["future"].add_done_callback(lambda f: f.exception())
+        self._pending[key] = entry
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # From here on the payload is fixed; later writes queue a new entry
+                self._pending.pop(key, None)
+                start = time.perf_counter()
+                nbytes = await loop.run_in_executor(self._executor, self._write_sync, entry["data"], path, entry["indent"])
+                elapsed_ms = (time.perf_counter() - start) * 1000
+        except BaseException as e:
+            if self._pending.get(key) is entry:
+                self._pending.pop(key)
+            self._stats["failures"] += 1
+            if not entry["future"].done():
+                entry["future"].set_exception(e)
+            logger.error(f"Failed to save result to {path}: {str(e)}")
+            raise
+        finally:
+            if key not in self._pending and not lock.locked():
+                self._locks.pop(key, None)
+
+        self._stats["writes"] += 1
+        self._stats["bytes_written"] += nbytes
+        self._stats["total_latency_ms"] += elapsed_ms
+        self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], elapsed_ms)
+        entry["future"].set_result(None)
+        logger.info(f"Saved result to {path} ({nbytes} bytes in {elapsed_ms:.1f} ms)")
+
+    def stats(self) -> Dict[str, Any]:
+        writes = self._stats["writes"]
+        return {
+            **self._stats,
+            "total_latency_ms": round(self._stats["total_latency_ms"], 2),
+            "max_latency_ms": round(self._stats["max_latency_ms"], 2),
+            "avg_latency_ms": round(self._stats["total_latency_ms"] / writes, 2) if writes else 0.0,
+            "queued_paths": len(self._pending)
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+artifact_writer = ArtifactWriter()
+
+
+async def save_result(data: Any, path: str, indent: int | None = ARTIFACT_INDENT) -> None:
+    await artifact_writer.write_json(data, path, indent=indent)
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class CourseCache:
+    """
+    Bounded LRU cache of assembled course documents keyed by course_id.
+
+    Each entry remembers the course write version it was built from; a lookup
+    with a different version is a miss and drops the stale entry. Cached
+    documents are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, course_id: str, version: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(course_id)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    del self._entries[course_id]
+                    self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(course_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, course_id: str, version: int, value: Any) -> None:
+        with self._lock:
+            self._entries[course_id] = (version, value)
+            self._entries.move_to_end(course_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, course_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(course_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
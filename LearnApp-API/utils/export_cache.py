@@ -0,0 +1,110 @@
+import os
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ExportCache:
+    """
+    Size-bounded LRU of rendered exports on disk.
+
+    Entries are files named by a hash of everything that went into them, so
+    an entry never goes stale; it is only evicted when the cache grows past
+    max_bytes. Recency is kept in file mtimes, so the order survives restarts.
+    New entries are written to a unique temp file and renamed into place, so
+    concurrent renders of the same key cannot corrupt each other.
+
+    Each worker process keeps its own view of the directory; a file removed by
+    another worker's eviction simply counts as a miss. Temp files older than
+    `temp_max_age` seconds are left over from renders that died halfway and
+    are removed on load; younger ones may belong to another worker's render.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, temp_max_age: float):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.temp_max_age = temp_max_age
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        cutoff = time.time() - self.temp_max_age
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.startswith("."):
+                if stat.st_mtime < cutoff:
+                    # Temp file left by a render that died halfway
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+                continue
+            files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._bytes += size
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def get(self, name: str) -> Optional[str]:
+        """Path of a cached entry, or None on a miss."""
+        with self._lock:
+            path = self.path(name)
+            if name in self._entries and os.path.exists(path):
+                self._entries.move_to_end(name)
+                os.utime(path)
+                self.hits += 1
+                return path
+            if name in self._entries:
+                self._bytes -= self._entries.pop(name)
+            self.misses += 1
+            return None
+
+    def temp_path(self, suffix: str = "") -> str:
+        """A unique file in the cache directory to render into before put()."""
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, prefix=".render-", suffix=suffix)
+        os.close(fd)
+        return path
+
+    def put(self, name: str, tmp_path: str) -> str:
+        """Move a finished render into the cache and evict down to max_bytes."""
+        with self._lock:
+            path = self.path(name)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            self._bytes -= self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._bytes += size
+            # Never evict the entry just written, even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                evicted, evicted_size = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+                try:
+                    os.unlink(self.path(evicted))
+                except FileNotFoundError:
+                    pass
+            return path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -1,12 +1,9 @@
-import os
-import json
-import random
 import logging
 import uuid
 from typing import Any, Dict, List, Optional
-from datetime import datetime
 from google import genai
 from google.genai import types
+from utils.key_pool import KeyLease
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -74,45 +71,24 @@ def generate_overall_plan(week_plans: List[str]) -> str:
         logger.error(f"Error generating overall plan: {str(e)}")
         raise
 
-async def save_result(data: Any, path: str) -> None:
-    try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
-        logger.info(f"Saved result to {path}")
-    except Exception as e:
-        logger.error(f"Failed to save result to {path}: {str(e)}")
-        raise
-
-def get_random_api_key(api_keys: List[str]) -> str:
-    return random.choice(api_keys)
-
-def initialize_client(api_keys: List[str]) -> genai.Client:
-    try:
-        api_key = get_random_api_key(api_keys)
-        client = genai.Client(api_key=api_key)
-        logger.info("Initialized Google GenAI client")
-        return client
-    except Exception as e:
-        logger.error(f"Failed to initialize client: {str(e)}")
-        raise
-
-def create_cache(
-    client: genai.Client,
+async def create_cache_async(
+    lease: KeyLease,
     model_id: int,
     display_name: str,
-    system_instruction: tuple,
-    contents: Optional[tuple] = None
+    system_instruction: Any,
+    contents: Optional[Any] = None,
+    ttl: Optional[int] = None
 ) -> str:
+    """Create a cached content through the SDK's async client, with the leased key."""
     cache_name = f"{display_name}-{uuid.uuid4()}"
     try:
-        print(MODEL_MAP[model_id])
-        cache = client.caches.create(
+        cache = await lease.client.aio.caches.create(
             model=MODEL_MAP[model_id],
             config=types.CreateCachedContentConfig(
                 display_name=cache_name,
                 system_instruction=system_instruction,
-                contents=contents
+                contents=contents,
+                ttl=f"{ttl}s" if ttl else None
             )
         )
         logger.info(f"Created cache: {cache_name}")
@@ -121,14 +97,23 @@ def create_cache(
         logger.error(f"Failed to create cache {cache_name}: {str(e)}")
         raise
 
-def delete_cache(client: genai.Client, cache_name: str) -> None:
+async def delete_cache_async(client: genai.Client, cache_name: str) -> None:
     try:
-        client.caches.delete(name=cache_name)
+        await client.aio.caches.delete(name=cache_name)
         logger.info(f"Deleted cache: {cache_name}")
     except Exception as e:
         logger.error(f"Failed to delete cache {cache_name}: {str(e)}")
         raise
 
+async def count_tokens_async(lease: KeyLease, model_id: int, contents: Any) -> int:
+    """count_tokens through the SDK's async client, with the leased key."""
+    try:
+        response = await lease.client.aio.models.count_tokens(model=MODEL_MAP[model_id], contents=contents)
+        return response.total_tokens
+    except Exception as e:
+        logger.error(f"Failed to count tokens: {str(e)}")
+        raise
+
 # Model mapping
 MODEL_MAP = {
     0: "gemini-2.0-flash",
@@ -136,25 +121,29 @@ MODEL_MAP = {
     2: "gemini-2.5-pro"
 }
 
-def generate_content(
-    client: genai.Client,
+async def generate_content_async(
+    lease: KeyLease,
     model_id: int,
     contents: Any,
-    cache_name: str,
-    response_schema: Any
+    cache_name: Optional[str],
+    response_schema: Any,
+    system_instruction: Optional[Any] = None
 ) -> Any:
+    """Generate structured content through the SDK's async client, with the leased key."""
     try:
-        response = client.models.generate_content(
+        response = await lease.client.aio.models.generate_content(
             model=MODEL_MAP[model_id],
             contents=contents,
             config=types.GenerateContentConfig(
                 cached_content=cache_name,
+                system_instruction=system_instruction,
                 response_mime_type="application/json",
                 response_schema=response_schema
             )
         )
+        lease.record_usage(response)
         logger.info("Successfully generated content")
         return response.parsed.model_dump()
     except Exception as e:
         logger.error(f"Failed to generate content: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -1,7 +1,5 @@
 from models.course_creation import CourseInput
-from typing import Dict, Any
-import os
-import json
+from typing import Any, Dict, Iterator, List, Optional
 
 def map_inputs(course_input: CourseInput) -> Dict[str, Any]:
     experience_map = {0: "I'm new", 1: "I've tried it before", 2: "I'm confident / advanced"}
@@ -18,11 +16,6 @@ def map_inputs(course_input: CourseInput) -> Dict[str, Any]:
         "custom_motivation": course_input.custom_motivation
     }
 
-async def save_result(result: Any, path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump(result, f, indent=4)
-        
 def get_difficulty_level(hours: int) -> str:
     if 4 <= hours <= 10:
         return "Low"
@@ -31,15 +24,77 @@ def get_difficulty_level(hours: int) -> str:
     elif 19 <= hours <= 25:
         return "High"
     
-def convert_json_to_markdown(course_data: dict) -> str:
+def assign_ids(course_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Convert JSON course outline to Markdown format.
-    
+    Give every week, module and block a stable positional ID.
+
+    IDs follow the Module:1.2 / Block:1.2.3 notation already used in milestone
+    prerequisites ("1", "1.2", "1.2.3"). IDs that are already present are kept.
+
     Args:
         course_data: Dictionary containing the course outline JSON.
-    
+
     Returns:
-        Markdown string representing the course outline.
+        The same dictionary, updated in place.
+    """
+    for week_idx, week in enumerate(course_data["course_outline"].get("weeks", []), 1):
+        week.setdefault("id", str(week_idx))
+        for module_idx, module in enumerate(week.get("week_modules", []), 1):
+            module.setdefault("id", f"{week['id']}.{module_idx}")
+            for block_idx, block in enumerate(module.get("content_blocks", []), 1):
+                block.setdefault("id", f"{module['id']}.{block_idx}")
+    return course_data
+    
+def _markdown_milestone(milestone: Dict[str, Any], heading: str) -> List[str]:
+    markdown = [f"{heading}: {milestone['milestone_title']}\n"]
+    markdown.append(f"**Description**: {milestone['description']}\n")
+    markdown.append("**Objectives**:\n")
+    for obj in milestone["objectives"]:
+        markdown.append(f"- {obj}")
+    markdown.append("\n**Deliverables**:\n")
+    for deliverable in milestone["deliverables"]:
+        markdown.append(f"- {deliverable}")
+    markdown.append("\n**References**:\n")
+    for ref in milestone["references"]:
+        markdown.append(f"- {ref['title']} ({ref['source']})")
+    return markdown
+
+def _markdown_module(module: Dict[str, Any]) -> List[str]:
+    markdown = [f"### {module['module_title']} ({module['duration_hours']} hours)\n"]
+    for block in module["content_blocks"]:
+        markdown.append(f"#### {block['block_title']} ({block['length']} minutes, {block['type']})\n")
+        markdown.append("**Objectives**:\n")
+        for obj in block["objectives"]:
+            markdown.append(f"- {obj}")
+        markdown.append("\n**References**:\n")
+        for ref in block["references"]:
+            markdown.append(f"- {ref['title']} ({ref['source']})")
+        markdown.append("\n")
+    return markdown
+
+def _markdown_week(week: Dict[str, Any]) -> List[str]:
+    markdown = [f"## Week {week['week_number']}: {week['week_topic']}\n"]
+    for module in week["week_modules"]:
+        markdown.extend(_markdown_module(module))
+
+    # Week Milestone
+    markdown.extend(_markdown_milestone(week["week_milestone"], "### Week Milestone"))
+    markdown.append("\n")
+    return markdown
+
+def iter_course_markdown(course_data: Dict[str, Any]) -> Iterator[str]:
+    """
+    Render a course outline to Markdown one section at a time.
+
+    Yields the course header, then each week, then the course milestone, so a
+    caller can stream the document without holding all of it. The weeks of
+    `course_data` may be any iterable, e.g. one that loads each week lazily.
+
+    Args:
+        course_data: Dictionary containing the course outline JSON.
+
+    Yields:
+        Consecutive chunks of the Markdown document.
     """
     course = course_data["course_outline"]
     markdown = []
@@ -47,67 +102,62 @@ def convert_json_to_markdown(course_data: dict) -> str:
     # Course Title and Overview
     markdown.append(f"# {course['title']}\n")
     markdown.append(f"**Overview**: {course['overview']}\n")
-    
+
     # Prerequisites
     markdown.append("## Prerequisites\n")
     for prereq in course["prerequisites"]:
         markdown.append(f"- {prereq}")
     markdown.append("\n")
-    
+
     # Learning Outcomes
     markdown.append("## Learning Outcomes\n")
     for outcome in course["learning_outcomes"]:
         markdown.append(f"- {outcome}")
     markdown.append("\n")
-    
+
     # Skills
     markdown.append("## Skills\n")
     for skill in course["skills"]:
         markdown.append(f"- {skill}")
     markdown.append("\n")
-    
-    # Weeks
+    yield "\n".join(markdown)
+
+    # Weeks; each chunk starts with the line break that joins it to the previous one
     for week in course["weeks"]:
-        markdown.append(f"## Week {week['week_number']}: {week['week_topic']}\n")
-        for module in week["week_modules"]:
-            markdown.append(f"### {module['module_title']} ({module['duration_hours']} hours)\n")
-            for block in module["content_blocks"]:
-                markdown.append(f"#### {block['block_title']} ({block['length']} minutes, {block['type']})\n")
-                markdown.append("**Objectives**:\n")
-                for obj in block["objectives"]:
-                    markdown.append(f"- {obj}")
-                markdown.append("\n**References**:\n")
-                for ref in block["references"]:
-                    markdown.append(f"- {ref['title']} ({ref['source']})")
-                markdown.append("\n")
-        
-        # Week Milestone
-        milestone = week["week_milestone"]
-        markdown.append(f"### Week Milestone: {milestone['milestone_title']}\n")
-        markdown.append(f"**Description**: {milestone['description']}\n")
-        markdown.append("**Objectives**:\n")
-        for obj in milestone["objectives"]:
-            markdown.append(f"- {obj}")
-        markdown.append("\n**Deliverables**:\n")
-        for deliverable in milestone["deliverables"]:
-            markdown.append(f"- {deliverable}")
-        markdown.append("\n**References**:\n")
-        for ref in milestone["references"]:
-            markdown.append(f"- {ref['title']} ({ref['source']})")
-        markdown.append("\n")
-    
+        yield "\n" + "\n".join(_markdown_week(week))
+
     # Course Milestone
-    milestone = course["course_milestone"]
-    markdown.append(f"## Course Milestone: {milestone['milestone_title']}\n")
-    markdown.append(f"**Description**: {milestone['description']}\n")
-    markdown.append("**Objectives**:\n")
-    for obj in milestone["objectives"]:
-        markdown.append(f"- {obj}")
-    markdown.append("\n**Deliverables**:\n")
-    for deliverable in milestone["deliverables"]:
-        markdown.append(f"- {deliverable}")
-    markdown.append("\n**References**:\n")
-    for ref in milestone["references"]:
-        markdown.append(f"- {ref['title']} ({ref['source']})")
+    yield "\n" + "\n".join(_markdown_milestone(course["course_milestone"], "## Course Milestone"))
+
+def iter_scope_markdown(title: str, week: Dict[str, Any], module: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """
+    Render one week of a course, or one module of it, to Markdown.
+
+    The slice keeps the course title and week heading, so it reads the same
+    as that part of the full outline.
+
+    Args:
+        title: Course title.
+        week: The week in the result.json layout.
+        module: One of the week's modules; the whole week (with its milestone) if None.
+
+    Yields:
+        Consecutive chunks of the Markdown document.
+    """
+    yield f"# {title}\n"
+    if module is None:
+        yield "\n" + "\n".join(_markdown_week(week))
+    else:
+        yield "\n" + "\n".join([f"## Week {week['week_number']}: {week['week_topic']}\n"] + _markdown_module(module))
+
+def convert_json_to_markdown(course_data: dict) -> str:
+    """
+    Convert JSON course outline to Markdown format.
     
-    return "\n".join(markdown)
+    Args:
+        course_data: Dictionary containing the course outline JSON.
+    
+    Returns:
+        Markdown string representing the course outline.
+    """
+    return "".join(iter_course_markdown(course_data))
@@ -0,0 +1,37 @@
+from typing import Any
+from fastapi import Request, Response
+
+# Mutable resources: clients may store them but must revalidate with If-None-Match
+REVALIDATE = "no-cache"
+
+# Content addressed by a hash of what produced it never changes under the same URL
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the values that identify a representation (store epoch, versions, ...)."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against `etag`.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    W/-prefixed validator from an intermediary still matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_headers(etag: str, cache_control: str = REVALIDATE) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
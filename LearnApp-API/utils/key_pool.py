@@ -0,0 +1,325 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+from google import genai
+from config.config import (
+    API_KEYS, KEY_RPM_LIMIT, KEY_TPM_LIMIT, KEY_TOKENS_PER_CALL, KEY_COOLDOWN_SECONDS,
+    KEY_REVOKED_COOLDOWN_SECONDS, KEY_ERROR_WINDOW, KEY_ERROR_RATE_THRESHOLD, KEY_MAX_WAIT_SECONDS
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Outcomes needed in the error window before its error rate can bench a key
+MIN_ERROR_SAMPLES = 5
+
+# Longest wait between availability checks while every key is throttled
+MAX_POLL_SECONDS = 1.0
+
+
+class NoUsableKeyError(RuntimeError):
+    """No API key can serve a call within the pool's maximum wait."""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens per minute, holding at most that many."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (a request larger than the bucket waits for a full one)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount: float, now: float) -> None:
+        """Take `amount` tokens; may go negative, so an underestimate is paid back before the next call."""
+        self._refill(now)
+        self.tokens -= amount
+
+    def drain(self, now: float) -> None:
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def utilization(self, now: float) -> float:
+        self._refill(now)
+        return min(1.0, max(0.0, 1.0 - self.tokens / self.capacity))
+
+
+class KeyState:
+    def __init__(self, key: str, rpm: int, tpm: int):
+        self.key = key
+        self.label = f"...{key[-4:]}" if len(key) > 8 else "..."
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self.outcomes: "deque[tuple]" = deque()
+        self.cooldown_until = 0.0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.counters = {"calls": 0, "errors": 0, "rate_limited": 0, "auth_failures": 0, "tokens_used": 0}
+
+    def error_rate(self, now: float, window: float) -> float:
+        while self.outcomes and self.outcomes[0][0] < now - window:
+            self.outcomes.popleft()
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, ok in self.outcomes if not ok) / len(self.outcomes)
+
+
+class KeyLease:
+    """
+    One call's claim on an API key; use as `async with key_pool.lease() as lease`.
+
+    Entering waits for the least-loaded healthy key. Leaving records the
+    outcome: an exception raised inside the block counts against the key
+    (429s and auth failures bench it), and the tokens reported through
+    record_usage settle the key's token bucket.
+    """
+
+    def __init__(self, pool: "KeyPool", tokens: int, prefer: Optional[str]):
+        self.pool = pool
+        self.estimated_tokens = tokens
+        self.prefer = prefer
+        self.state: Optional[KeyState] = None
+        self.tokens_used: Optional[int] = None
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    @property
+    def key(self) -> str:
+        return self.state.key
+
+    @property
+    def client(self) -> genai.Client:
+        return self.pool.client(self.state.key)
+
+    def record_usage(self, response: Any) -> None:
+        """Take the token counts from a generate_content response's usage metadata."""
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None)
+        if total is not None:
+            self.tokens_used = total
+        self.prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        # Prompt tokens served from an explicit or implicit cache
+        self.cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+
+    async def __aenter__(self) -> "KeyLease":
+        self.state = await self.pool._acquire(self.estimated_tokens, self.prefer)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self.pool._release(self, exc)
+        return False
+
+
+class KeyPool:
+    """
+    Gemini API keys with per-key rate limits and health tracking.
+
+    Each key has token buckets for its requests and tokens per minute, an
+    error rate over the last `error_window` seconds and a cooldown. A 429
+    benches the key for `cooldown` seconds, doubling while it keeps
+    happening; an authentication failure (revoked or invalid key) benches it
+    for `revoked_cooldown`; an error rate above `error_threshold` benches it
+    like a 429. Every call gets the least-loaded key that is not benched and
+    has room in both buckets, waiting if there is none. When no key can free
+    up within `max_wait` seconds (all benched for auth failures, say), the
+    call fails with NoUsableKeyError instead of waiting. A caller that holds
+    state tied to one key (a context cache lives in the key's project) can
+    prefer that key; it is used while it has capacity.
+    """
+
+    def __init__(
+        self,
+        api_keys: List[str],
+        rpm: int = KEY_RPM_LIMIT,
+        tpm: int = KEY_TPM_LIMIT,
+        tokens_per_call: int = KEY_TOKENS_PER_CALL,
+        cooldown: float = KEY_COOLDOWN_SECONDS,
+        revoked_cooldown: float = KEY_REVOKED_COOLDOWN_SECONDS,
+        error_window: float = KEY_ERROR_WINDOW,
+        error_threshold: float = KEY_ERROR_RATE_THRESHOLD,
+        max_wait: float = KEY_MAX_WAIT_SECONDS
+    ):
+        # Kept by reference, so keys added to config.API_KEYS at startup join the pool
+        self.api_keys = api_keys
+        self.rpm = rpm
+        self.tpm = tpm
+        self.tokens_per_call = tokens_per_call
+        self.cooldown = cooldown
+        self.revoked_cooldown = revoked_cooldown
+        self.error_window = error_window
+        self.error_threshold = error_threshold
+        self.max_wait = max_wait
+        self._states: Dict[str, KeyState] = {}
+        self._clients: Dict[str, genai.Client] = {}
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.total_wait_ms = 0.0
+        self.rejected = 0
+
+    def _key_states(self) -> List[KeyState]:
+        for key in self.api_keys:
+            if key not in self._states:
+                self._states[key] = KeyState(key, self.rpm, self.tpm)
+        return [self._states[key] for key in self.api_keys]
+
+    def client(self, key: str) -> genai.Client:
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = genai.Client(api_key=key)
+            return self._clients[key]
+
+    def lease(self, tokens: Optional[int] = None, prefer: Optional[str] = None) -> KeyLease:
+        """
+        Claim a key for one API call.
+
+        Args:
+            tokens: Expected tokens of the call (prompt and response); KEY_TOKENS_PER_CALL if None.
+            prefer: Key to use while it is healthy and has capacity.
+        """
+        return KeyLease(self, self.tokens_per_call if tokens is None else tokens, prefer)
+
+    def _pick(self, tokens: int, prefer: Optional[str], now: float) -> tuple:
+        """(state, None) for a usable key, else (None, seconds until one may free up)."""
+        states = self._key_states()
+        if not states:
+            raise NoUsableKeyError("No Gemini API keys configured")
+        ready, wait = [], None
+        for state in states:
+            if state.cooldown_until > now:
+                delay = state.cooldown_until - now
+            else:
+                delay = max(state.requests.wait_time(1, now), state.tokens.wait_time(tokens, now))
+                if delay == 0:
+                    ready.append(state)
+                    continue
+            wait = delay if wait is None else min(wait, delay)
+        if not ready:
+            return None, wait
+        for state in ready:
+            if state.key == prefer:
+                return state, None
+        return min(ready, key=lambda state: (
+            state.in_flight,
+            max(state.requests.utilization(now), state.tokens.utilization(now)),
+            state.error_rate(now, self.error_window)
+        )), None
+
+    async def _acquire(self, tokens: int, prefer: Optional[str]) -> KeyState:
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                state, wait = self._pick(tokens, prefer, now)
+                if state is not None:
+                    state.requests.consume(1, now)
+                    state.tokens.consume(tokens, now)
+                    state.in_flight += 1
+                    state.counters["calls"] += 1
+                    break
+                if now + wait > deadline:
+                    self.rejected += 1
+                    raise NoUsableKeyError(f"No usable Gemini API key: the next one frees up in {wait:.0f}s")
+            waited = True
+            await asyncio.sleep(min(wait, MAX_POLL_SECONDS))
+        if waited:
+            self.waits += 1
+            self.total_wait_ms += (time.perf_counter() - start) * 1000
+        return state
+
+    @staticmethod
+    def _classify(error: BaseException) -> str:
+        code = getattr(error, "code", None)
+        text = str(error)
+        if code == 429 or "RESOURCE_EXHAUSTED" in text:
+            return "rate_limited"
+        if code in (401, 403) or "API_KEY_INVALID" in text or "PERMISSION_DENIED" in text:
+            return "auth"
+        if isinstance(code, int) and 400 <= code < 500:
+            # The request was wrong, not the key
+            return "request"
+        return "error"
+
+    def _release(self, lease: KeyLease, error: Optional[BaseException]) -> None:
+        with self._lock:
+            state = lease.state
+            now = time.monotonic()
+            state.in_flight -= 1
+            if lease.tokens_used is not None:
+                state.tokens.consume(lease.tokens_used - lease.estimated_tokens, now)
+                state.counters["tokens_used"] += lease.tokens_used
+            if error is None or isinstance(error, asyncio.CancelledError):
+                if error is None:
+                    state.outcomes.append((now, True))
+                    state.consecutive_failures = 0
+                return
+
+            kind = self._classify(error)
+            state.last_error = f"{type(error).__name__}: {str(error)[:200]}"
+            if kind == "request":
+                return
+            state.outcomes.append((now, False))
+            state.counters["errors"] += 1
+            state.consecutive_failures += 1
+            if kind == "rate_limited":
+                state.counters["rate_limited"] += 1
+                state.requests.drain(now)
+                self._bench(state, self.cooldown * 2 ** min(state.consecutive_failures - 1, 5), now)
+            elif kind == "auth":
+                state.counters["auth_failures"] += 1
+                self._bench(state, self.revoked_cooldown, now)
+            elif (len(state.outcomes) >= MIN_ERROR_SAMPLES
+                  and state.error_rate(now, self.error_window) >= self.error_threshold):
+                self._bench(state, self.cooldown, now)
+
+    @staticmethod
+    def _bench(state: KeyState, seconds: float, now: float) -> None:
+        state.cooldown_until = max(state.cooldown_until, now + seconds)
+        logger.warning(f"API key {state.label} benched for {seconds:.0f}s after {state.last_error}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            keys = []
+            for state in self._key_states():
+                keys.append({
+                    "key": state.label,
+                    "healthy": state.cooldown_until <= now,
+                    "cooldown_remaining": round(max(0.0, state.cooldown_until - now), 1),
+                    "in_flight": state.in_flight,
+                    "rpm_utilization": round(state.requests.utilization(now), 3),
+                    "tpm_utilization": round(state.tokens.utilization(now), 3),
+                    "error_rate": round(state.error_rate(now, self.error_window), 3),
+                    "last_error": state.last_error,
+                    **state.counters
+                })
+            return {
+                "keys": keys,
+                "rpm_limit": self.rpm,
+                "tpm_limit": self.tpm,
+                "waits": self.waits,
+                "total_wait_ms": round(self.total_wait_ms, 2),
+                "rejected": self.rejected
+            }
+
+
+key_pool = KeyPool(API_KEYS)
@@ -0,0 +1,34 @@
+from typing import Any, Dict
+from markdown_pdf import MarkdownPdf, Section
+
+# Renderer settings; they are part of the export cache key, so changing them re-renders
+PDF_OPTIONS = {
+    "toc_level": 3,
+    "optimize": True,
+    "author": "Course Converter API"
+}
+
+# Bump when convert_json_to_markdown or the renderer changes output for the same input
+PDF_LAYOUT_VERSION = 1
+
+
+def render_pdf(markdown_content: str, title: str, output_path: str, options: Dict[str, Any] = PDF_OPTIONS) -> None:
+    """
+    Render Markdown to a PDF file.
+
+    Runs inside the render process pool, so this module must stay free of
+    import-time side effects.
+
+    Args:
+        markdown_content: Course outline in Markdown.
+        title: Document title stored in the PDF metadata.
+        output_path: File to write.
+        options: Renderer settings (see PDF_OPTIONS).
+    """
+    pdf = MarkdownPdf(toc_level=options["toc_level"], optimize=options["optimize"])
+    pdf.meta["title"] = title
+    pdf.meta["author"] = options["author"]
+
+    # Add Markdown content as a single section
+    pdf.add_section(Section(markdown_content, toc=True))
+    pdf.save(output_path)
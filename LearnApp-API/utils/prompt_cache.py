@@ -0,0 +1,531 @@
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import importlib
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from google.genai import types
+from config.config import (
+    PROMPT_CACHE_TTL_SECONDS, PROMPT_CACHE_IDLE_SECONDS, PROMPT_CACHE_WARM_MODELS,
+    CACHE_MIN_TOKENS, CACHED_TOKEN_RATE, CACHE_STORAGE_RATE, IMPLICIT_CACHE_MODELS
+)
+from utils.genai import MODEL_MAP, count_tokens_async, create_cache_async, delete_cache_async, generate_content_async
+from utils.key_pool import KeyLease, KeyPool, key_pool
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Static system instruction of each generation stage, as (module, attribute) parts
+PROMPT_BUNDLES = {
+    "course_outline": [
+        ("prompts.online.system", "SYSTEM_INSTRUCTION"),
+        ("prompts.online.course_outliner", "COURSE_OUTLINE_SYSTEM"),
+        ("prompts.online.course_outliner", "COURSE_OUTLINE_FORMAT")
+    ],
+    "weekly_content": [
+        ("prompts.online.system", "SYSTEM_INSTRUCTION"),
+        ("prompts.online.week_generator", "WEEK_SYSTEM"),
+        ("prompts.online.week_generator", "WEEK_FORMAT")
+    ],
+    "course_milestone": [
+        ("prompts.online.system", "SYSTEM_INSTRUCTION"),
+        ("prompts.online.course_milestone", "MILESTONE_SYSTEM"),
+        ("prompts.online.course_milestone", "MILESTONE_FORMAT")
+    ]
+}
+
+# Seconds between checks of the prompt files for edits
+PROMPT_CHECK_INTERVAL = 5.0
+
+# A cache closer than this to expiry is renewed before it is handed out
+RENEW_MARGIN_SECONDS = 120
+
+# How a stage's static prompt is sent: from an explicit context cache, inline
+# with its requests primed so the model's implicit cache can reuse the prefix,
+# or inline with no caching at all
+EXPLICIT, IMPLICIT, PLAIN = "explicit", "implicit", "plain"
+
+# A stage whose requests share the job's inputs too (the learner's requirements,
+# the outline) is served from a cache of the job's own, holding the static
+# prompt plus those inputs
+JOB = "job"
+
+
+class PromptCacheRegistry:
+    """
+    Process-wide context caches of the static stage prompts.
+
+    Every course generation sends the same system instruction per stage
+    (SYSTEM_INSTRUCTION plus the stage's *_SYSTEM and *_FORMAT), whoever the
+    learner is, so one cache per (model, stage, prompt version) serves all
+    concurrent jobs; the per-job inputs travel in the request. A cache lives
+    in the project of the key that created it, so there is one per API key
+    actually used.
+
+    Whether a stage uses a cache at all is decided by plan(): the bundle's
+    token count is checked against the model's minimum cacheable size, and a
+    cache is only created when the reads expected within one TTL (the job's
+    own plus the stage's recent traffic) save more than storing it costs.
+
+    Caches are created on first use (or at startup for PROMPT_CACHE_WARM_MODELS)
+    and their TTL is renewed while they are used. One idle for `idle_seconds`
+    is left to expire. The prompt version is a hash of the bundle's text; when
+    a prompt file changes, its module is reloaded and the next request builds
+    a cache of the new version.
+    """
+
+    def __init__(
+        self,
+        pool: KeyPool,
+        ttl: int = PROMPT_CACHE_TTL_SECONDS,
+        idle_seconds: float = PROMPT_CACHE_IDLE_SECONDS,
+        bundles: Dict[str, List[Tuple[str, str]]] = PROMPT_BUNDLES
+    ):
+        self.pool = pool
+        self.ttl = ttl
+        self.idle_seconds = idle_seconds
+        self.bundles = bundles
+        self._texts: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked = 0.0
+        self._entries: Dict[tuple, Dict[str, Any]] = {}
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self._token_counts: Dict[tuple, int] = {}
+        self._uses: Dict[tuple, "deque[float]"] = {}
+        self._renewer: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0, "creations": 0, "renewals": 0, "rebuilds": 0, "failures": 0,
+            "explicit_plans": 0, "implicit_plans": 0, "plain_plans": 0
+        }
+
+    def _check_prompt_files(self) -> None:
+        """Reload prompt modules whose files changed; drop the bundle texts built from them."""
+        now = time.monotonic()
+        if now - self._checked < PROMPT_CHECK_INTERVAL:
+            return
+        self._checked = now
+        for module_name in {module_name for parts in self.bundles.values() for module_name, _ in parts}:
+            module = sys.modules.get(module_name) or importlib.import_module(module_name)
+            try:
+                mtime = os.path.getmtime(module.__file__)
+            except OSError:
+                continue
+            previous = self._mtimes.setdefault(module_name, mtime)
+            if mtime != previous:
+                importlib.reload(module)
+                self._mtimes[module_name] = mtime
+                self._texts.clear()
+                logger.info(f"Prompt module {module_name} changed, rebuilding its prompt caches")
+
+    def bundle(self, stage: str) -> Tuple[str, Tuple[str, ...]]:
+        """(version, system instruction parts) of a stage's prompt bundle."""
+        self._check_prompt_files()
+        if stage not in self._texts:
+            texts = tuple(getattr(importlib.import_module(module_name), attribute) for module_name, attribute in self.bundles[stage])
+            version = hashlib.sha256("\0".join(texts).encode("utf-8")).hexdigest()[:12]
+            self._texts[stage] = (version, texts)
+        return self._texts[stage]
+
+    def warm_key(self, model_id: int, stage: str) -> Optional[str]:
+        """Key holding a current cache of the stage, for the key pool to prefer."""
+        version, _ = self.bundle(stage)
+        entries = [
+            (entry["last_used"], key) for (entry_model, entry_stage, key), entry in self._entries.items()
+            if entry_model == model_id and entry_stage == stage and entry["version"] == version
+        ]
+        return max(entries)[1] if entries else None
+
+    async def token_count(self, model_id: int, stage: str) -> int:
+        """Tokens of a stage's prompt bundle, counted once per model and prompt version."""
+        version, texts = self.bundle(stage)
+        count_key = (model_id, stage, version)
+        if count_key not in self._token_counts:
+            async with self.pool.lease(tokens=0) as lease:
+                self._token_counts[count_key] = await count_tokens_async(lease, model_id, list(texts))
+        return self._token_counts[count_key]
+
+    def record_use(self, model_id: int, stage: str) -> None:
+        self._uses.setdefault((model_id, stage), deque()).append(time.monotonic())
+
+    def recent_uses(self, model_id: int, stage: str) -> int:
+        """Requests of the stage in the last TTL, across all jobs."""
+        uses = self._uses.get((model_id, stage))
+        if not uses:
+            return 0
+        cutoff = time.monotonic() - self.ttl
+        while uses and uses[0] < cutoff:
+            uses.popleft()
+        return len(uses)
+
+    def storage_cost(self, model_id: int, tokens: int) -> float:
+        """Cost of keeping `tokens` cached for one TTL, in uncached input tokens."""
+        return tokens * self.ttl / 3600 * CACHE_STORAGE_RATE[model_id]
+
+    async def plan(self, model_id: int, stage: str, expected_uses: int) -> Dict[str, Any]:
+        """
+        Choose how a job sends a stage's static prompt.
+
+        Args:
+            model_id: Model of the job.
+            stage: Prompt bundle of the stage (a PROMPT_BUNDLES key).
+            expected_uses: Requests of the stage the job will make.
+
+        Returns:
+            Plan with the mode (EXPLICIT, IMPLICIT or PLAIN), the bundle's
+            tokens, the reads expected within one TTL and the reason.
+        """
+        try:
+            tokens = await self.token_count(model_id, stage)
+        except Exception as e:
+            # Cannot tell: try the cache, whose creation rejects a bundle that is too small
+            logger.error(f"Failed to count tokens of {stage}, planning an explicit cache: {str(e)}")
+            self._stats["explicit_plans"] += 1
+            return {"mode": EXPLICIT, "tokens": 0, "expected_uses": expected_uses, "reason": "token count failed"}
+        uses = expected_uses + self.recent_uses(model_id, stage)
+        saving = tokens * uses * (1 - CACHED_TOKEN_RATE[model_id])
+        storage = self.storage_cost(model_id, tokens)
+        implicit = IMPLICIT if model_id in IMPLICIT_CACHE_MODELS else PLAIN
+        if tokens < CACHE_MIN_TOKENS[model_id]:
+            mode, reason = PLAIN, f"below the {CACHE_MIN_TOKENS[model_id]} token minimum"
+        elif self.warm_key(model_id, stage) is not None:
+            mode, reason = EXPLICIT, "a cache is warm"
+        elif saving > storage:
+            mode, reason = EXPLICIT, f"saves ~{saving:.0f} tokens for ~{storage:.0f} of storage"
+        else:
+            mode, reason = implicit, f"saves ~{saving:.0f} tokens, storage costs ~{storage:.0f}"
+        self._stats[f"{mode}_plans"] += 1
+        return {"mode": mode, "tokens": tokens, "expected_uses": uses, "reason": reason}
+
+    async def cache_for(self, lease: KeyLease, model_id: int, stage: str) -> Tuple[Optional[str], Tuple[str, ...], bool]:
+        """
+        Cache of a stage's prompt bundle for the leased key.
+
+        Returns:
+            (cache name, or None to send the bundle inline; the bundle's system
+            instruction parts; whether the cache was created by this call).
+        """
+        version, texts = self.bundle(stage)
+        entry_key = (model_id, stage, lease.key)
+        async with self._locks.setdefault(entry_key, asyncio.Lock()):
+            now = time.monotonic()
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry["version"] == version:
+                if entry["expires_at"] - now < RENEW_MARGIN_SECONDS and not await self._renew(entry_key, entry):
+                    entry = None
+            elif entry is not None:
+                # Prompt files changed: the old cache is no longer renewed and expires on its own
+                self._stats["rebuilds"] += 1
+                entry = None
+
+            created = entry is None
+            if created:
+                try:
+                    name = await create_cache_async(
+                        lease, model_id, f"prompt-{stage}-{version}", texts, ttl=self.ttl
+                    )
+                except Exception as e:
+                    if "too small" not in str(e).lower():
+                        self._stats["failures"] += 1
+                        raise
+                    # The count was off: remember the bundle as uncacheable so later plans send it inline
+                    logger.info(f"Prompts of {stage} are below the minimum cache size of {MODEL_MAP[model_id]}, sending them inline")
+                    self._token_counts[(model_id, stage, version)] = 0
+                    return None, texts, False
+                entry = {"name": name, "version": version, "expires_at": time.monotonic() + self.ttl, "last_used": now}
+                self._entries[entry_key] = entry
+                self._stats["creations"] += 1
+            else:
+                self._stats["hits"] += 1
+            entry["last_used"] = now
+            return entry["name"], texts, created
+
+    async def _renew(self, entry_key: tuple, entry: Dict[str, Any]) -> bool:
+        _, _, key = entry_key
+        try:
+            await self.pool.client(key).aio.caches.update(
+                name=entry["name"],
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s")
+            )
+        except Exception as e:
+            # Expired or deleted behind our back: forget it, the next use creates a new one
+            logger.error(f"Failed to renew prompt cache {entry['name']}: {str(e)}")
+            self._entries.pop(entry_key, None)
+            return False
+        entry["expires_at"] = time.monotonic() + self.ttl
+        self._stats["renewals"] += 1
+        return True
+
+    async def _renew_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 4)
+            now = time.monotonic()
+            for entry_key, entry in list(self._entries.items()):
+                model_id, stage, _ = entry_key
+                if entry["version"] != self.bundle(stage)[0] or now - entry["last_used"] > self.idle_seconds:
+                    # Outdated or idle: stop renewing and let the TTL expire it
+                    self._entries.pop(entry_key, None)
+                    continue
+                if entry["expires_at"] - now < self.ttl / 2:
+                    async with self._locks.setdefault(entry_key, asyncio.Lock()):
+                        await self._renew(entry_key, entry)
+
+    async def _warm(self, model_ids: List[int]) -> None:
+        for model_id in model_ids:
+            for stage in self.bundles:
+                try:
+                    if await self.token_count(model_id, stage) < CACHE_MIN_TOKENS[model_id]:
+                        continue
+                    async with self.pool.lease(prefer=self.warm_key(model_id, stage)) as lease:
+                        await self.cache_for(lease, model_id, stage)
+                except Exception as e:
+                    logger.error(f"Failed to warm prompt cache {stage} for model {model_id}: {str(e)}")
+                    return
+
+    def start(self, warm_models: List[int] = PROMPT_CACHE_WARM_MODELS) -> None:
+        """Start renewing caches and warm the given models' caches in the background."""
+        self._renewer = asyncio.create_task(self._renew_loop())
+        if warm_models and self.pool.api_keys:
+            asyncio.create_task(self._warm(list(warm_models)))
+
+    async def stop(self) -> None:
+        """Stop renewing and delete every cache this process created."""
+        if self._renewer is not None:
+            self._renewer.cancel()
+            self._renewer = None
+        entries, self._entries = self._entries, {}
+        for (_, _, key), entry in entries.items():
+            try:
+                await delete_cache_async(self.pool.client(key), entry["name"])
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "caches": [
+                {"model_id": model_id, "stage": stage, "key": f"...{key[-4:]}", "version": entry["version"]}
+                for (model_id, stage, key), entry in self._entries.items()
+            ],
+            "bundle_tokens": {
+                f"{MODEL_MAP[model_id]}/{stage}": tokens for (model_id, stage, _), tokens in self._token_counts.items()
+            }
+        }
+
+
+class GenerationJob:
+    """
+    Requests of one course generation job.
+
+    Each stage is planned on its first request (see PromptCacheRegistry.plan):
+    its static prompts come from the registry's shared cache or are sent
+    inline. In implicit mode the first request of a stage goes alone and the
+    rest follow once it is done, so the model has seen the shared prefix
+    before they arrive.
+
+    A stage with several requests sharing job inputs (the week requests all
+    carry the learner's requirements and the outline) may instead get a cache
+    of its own: the stage's static prompt plus those inputs, created on the
+    first request, so each request only sends what differs. A request can
+    reference a single cache, so this cache replaces the shared one for the
+    stage; it lives in the project of the key that created it, and requests
+    leased on another key send everything inline. Its TTL is renewed while the
+    stage runs, and if creating it fails the stage falls back to its shared
+    plan for the rest of the job. close() deletes these caches. Token usage
+    is tallied per stage for log_summary().
+
+    There is no single cache for all of a job's stages: each stage's static
+    prompt lives in the registry's shared caches, and only the inputs a
+    stage's requests have in common are worth caching per job.
+    """
+
+    def __init__(self, registry: PromptCacheRegistry, model_id: int, user_instruction: str, job_id: Optional[str] = None):
+        self.registry = registry
+        self.model_id = model_id
+        self.user_instruction = user_instruction
+        self.job_id = job_id
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._plan_lock = asyncio.Lock()
+        self._primers: Dict[str, asyncio.Event] = {}
+        self._job_caches: Dict[str, Dict[str, Any]] = {}
+        self._job_cache_locks: Dict[str, asyncio.Lock] = {}
+
+    async def _plan(self, stage: str, expected_uses: int, context: List[str]) -> Dict[str, Any]:
+        async with self._plan_lock:
+            if stage not in self.stages:
+                plan = await self.registry.plan(self.model_id, stage, expected_uses)
+                if context and expected_uses > 1:
+                    plan = await self._plan_job_cache(stage, plan, expected_uses, context)
+                self.stages[stage] = {**plan, "requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "storage_cost": 0.0}
+                logger.info(f"Job {self.job_id}: {stage} uses {plan['mode']} caching ({plan['tokens']} prompt tokens, "
+                            f"~{plan['expected_uses']} reads per TTL; {plan['reason']})")
+        return self.stages[stage]
+
+    async def _plan_job_cache(self, stage: str, plan: Dict[str, Any], expected_uses: int, context: List[str]) -> Dict[str, Any]:
+        """Upgrade a stage's plan to a job cache when caching the job's inputs too saves more."""
+        registry = self.registry
+        try:
+            async with registry.pool.lease(tokens=0) as lease:
+                context_tokens = await count_tokens_async(lease, self.model_id, [self.user_instruction, *context])
+        except Exception as e:
+            logger.error(f"Job {self.job_id}: failed to count the {stage} inputs, keeping the {plan['mode']} plan: {str(e)}")
+            return plan
+        tokens = plan["tokens"] + context_tokens
+        if tokens < CACHE_MIN_TOKENS[self.model_id]:
+            return plan
+        discount = 1 - CACHED_TOKEN_RATE[self.model_id]
+        saving = tokens * expected_uses * discount
+        storage = registry.storage_cost(self.model_id, tokens)
+        shared_saving = plan["tokens"] * expected_uses * discount if plan["mode"] == EXPLICIT else 0
+        if saving - storage <= shared_saving:
+            return plan
+        return {
+            **plan, "mode": JOB, "fallback": plan["mode"], "tokens": tokens,
+            "reason": f"caching the job's inputs saves ~{saving:.0f} tokens for ~{storage:.0f} of storage"
+        }
+
+    async def _job_cache(self, lease: KeyLease, stage: str, usage: Dict[str, Any], context: List[str]) -> Optional[str]:
+        """Name of the stage's job cache if it lives in the leased key's project, creating it on first use."""
+        async with self._job_cache_locks.setdefault(stage, asyncio.Lock()):
+            if usage["mode"] != JOB:
+                # A request queued behind a failed creation: the stage has fallen back already
+                return None
+            cache = self._job_caches.get(stage)
+            now = time.monotonic()
+            if cache is None:
+                try:
+                    name = await create_cache_async(
+                        lease, self.model_id, f"job-{stage}", self.registry.bundle(stage)[1],
+                        [self.user_instruction, *context], ttl=self.registry.ttl
+                    )
+                except Exception as e:
+                    logger.error(f"Job {self.job_id}: failed to create the {stage} cache, "
+                                 f"falling back to {usage['fallback']} caching: {str(e)}")
+                    usage["mode"] = usage["fallback"]
+                    return None
+                cache = self._job_caches[stage] = {"name": name, "key": lease.key, "expires_at": now + self.registry.ttl}
+                usage["storage_cost"] += self.registry.storage_cost(self.model_id, usage["tokens"])
+            elif cache["expires_at"] - now < RENEW_MARGIN_SECONDS:
+                try:
+                    await self.registry.pool.client(cache["key"]).aio.caches.update(
+                        name=cache["name"],
+                        config=types.UpdateCachedContentConfig(ttl=f"{self.registry.ttl}s")
+                    )
+                except Exception as e:
+                    logger.error(f"Job {self.job_id}: failed to renew the {stage} cache, "
+                                 f"falling back to {usage['fallback']} caching: {str(e)}")
+                    usage["mode"] = usage["fallback"]
+                    return None
+                cache["expires_at"] = now + self.registry.ttl
+                usage["storage_cost"] += self.registry.storage_cost(self.model_id, usage["tokens"])
+            return cache["name"] if cache["key"] == lease.key else None
+
+    async def generate(
+        self,
+        stage: str,
+        contents: List[str],
+        response_schema: Any,
+        expected_uses: int = 1,
+        context: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Run one stage request.
+
+        Args:
+            stage: Prompt bundle of the stage (a PROMPT_BUNDLES key).
+            contents: The request's own inputs, sent last.
+            response_schema: Schema for response validation.
+            expected_uses: Requests of this stage in the job, for planning.
+            context: Inputs shared by all of the stage's requests, sent after
+                the learner's requirements; cached with them in a job cache
+                when that pays off.
+
+        Returns:
+            The parsed response.
+        """
+        context = context or []
+        usage = await self._plan(stage, expected_uses, context)
+        primer = None
+        if usage["mode"] == IMPLICIT:
+            if stage in self._primers:
+                await self._primers[stage].wait()
+            else:
+                primer = self._primers[stage] = asyncio.Event()
+
+        registry = self.registry
+        registry.record_use(self.model_id, stage)
+        try:
+            if usage["mode"] == JOB:
+                prefer = self._job_caches.get(stage, {}).get("key")
+            else:
+                prefer = registry.warm_key(self.model_id, stage) if usage["mode"] == EXPLICIT else None
+            async with registry.pool.lease(prefer=prefer) as lease:
+                cache_name, system_instruction = None, registry.bundle(stage)[1]
+                request = [self.user_instruction, *context, *contents]
+                if usage["mode"] == JOB:
+                    cache_name = await self._job_cache(lease, stage, usage, context)
+                    if cache_name is not None:
+                        request = contents
+                if usage["mode"] == EXPLICIT:
+                    cache_name, system_instruction, created = await registry.cache_for(lease, self.model_id, stage)
+                    if created:
+                        usage["storage_cost"] += registry.storage_cost(self.model_id, usage["tokens"])
+                    elif cache_name is None:
+                        # The bundle turned out below the cache minimum: the stage is sent inline from now on
+                        usage["mode"] = PLAIN
+                        usage["reason"] = f"below the {CACHE_MIN_TOKENS[self.model_id]} token minimum"
+                response = await generate_content_async(
+                    lease, self.model_id, request, cache_name, response_schema,
+                    system_instruction=None if cache_name else system_instruction
+                )
+                usage["requests"] += 1
+                usage["prompt_tokens"] += lease.prompt_tokens
+                usage["cached_tokens"] += lease.cached_tokens
+                return response
+        finally:
+            if primer is not None:
+                primer.set()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Per-stage plan and measured usage.
+
+        saved_tokens is the cached prompt tokens' discount minus the storage of
+        caches this job created, in uncached input tokens.
+        """
+        rate = CACHED_TOKEN_RATE[self.model_id]
+        return {
+            stage: {
+                **usage,
+                "storage_cost": round(usage["storage_cost"], 1),
+                "saved_tokens": round(usage["cached_tokens"] * (1 - rate) - usage["storage_cost"], 1)
+            }
+            for stage, usage in self.stages.items()
+        }
+
+    async def close(self) -> None:
+        """Delete the job's caches; the shared prompt caches stay with the registry."""
+        caches, self._job_caches = self._job_caches, {}
+        for cache in caches.values():
+            try:
+                await delete_cache_async(self.registry.pool.client(cache["key"]), cache["name"])
+            except Exception:
+                # Logged by delete_cache_async; the cache expires with its TTL
+                pass
+
+    def log_summary(self) -> None:
+        for stage, usage in self.summary().items():
+            logger.info(
+                f"Job {self.job_id}: {stage} ({usage['mode']}) made {usage['requests']} requests, "
+                f"{usage['cached_tokens']} of {usage['prompt_tokens']} prompt tokens cached, "
+                f"~{usage['saved_tokens']} input tokens saved"
+            )
+
+
+prompt_caches = PromptCacheRegistry(key_pool)
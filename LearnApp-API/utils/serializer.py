@@ -0,0 +1,98 @@
+import json
+import logging
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder with compact separators
+    orjson = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(data: Any, indent: int | None = None) -> bytes:
+    """
+    Serialize `data` to UTF-8 JSON bytes.
+
+    Args:
+        data: JSON-serializable object.
+        indent: None for compact output; otherwise pretty-print (orjson only
+            supports an indent of 2, other widths go through the stdlib).
+
+    Returns:
+        Encoded JSON.
+    """
+    if orjson is not None and indent in (None, 2):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent is None:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_str(data: Any) -> str:
+    """Compact JSON as text, for SQLite columns and log lines."""
+    return dumps(data).decode("utf-8")
+
+
+def loads(raw: bytes | str) -> Any:
+    """Parse JSON in either the compact or the legacy pretty-printed layout."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def load_file(path: str) -> Any:
+    """Read a JSON artifact regardless of the layout it was written in."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def benchmark(responses_dir: str, rounds: int = 20) -> None:
+    """Compare stdlib pretty JSON with the compact backend on the artifacts in `responses_dir`."""
+    import os
+    import time
+
+    documents = []
+    for root, _, files in os.walk(responses_dir):
+        for name in files:
+            if name.endswith(".json"):
+                try:
+                    documents.append(load_file(os.path.join(root, name)))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable artifact {os.path.join(root, name)}")
+
+    def measure(dump, load):
+        encoded = [dump(doc) for doc in documents]
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for doc in documents:
+                dump(doc)
+        dump_ms = (time.perf_counter() - start) * 1000 / rounds
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for raw in encoded:
+                load(raw)
+        load_ms = (time.perf_counter() - start) * 1000 / rounds
+        return sum(len(raw) for raw in encoded), dump_ms, load_ms
+
+    results = {
+        "json (indent=2)": measure(lambda d: json.dumps(d, indent=2).encode("utf-8"), json.loads),
+        f"{BACKEND} (compact)": measure(dumps, loads)
+    }
+    print(f"{len(documents)} artifacts from {responses_dir}, averaged over {rounds} rounds")
+    print(f"{'mode':<20}{'bytes':>12}{'dump ms':>12}{'load ms':>12}")
+    for mode, (nbytes, dump_ms, load_ms) in results.items():
+        print(f"{mode:<20}{nbytes:>12}{dump_ms:>12.2f}{load_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    from config.config import RESPONSES_DIR
+
+    benchmark(RESPONSES_DIR)